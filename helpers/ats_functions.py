@@ -1,18 +1,22 @@
 """Helper module to call some functionality in Automation Server using the API"""
 
+import json
 import logging
+import math
 import os
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
 from automation_server_client import WorkItem, Workqueue
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
+from helpers import config
 
-def get_workqueue_items(workqueue: Workqueue, return_data=False):
-    """
-    Retrieve items from the specified workqueue.
-    If the queue is empty, return an empty list.
-    """
+
+def _get_ats_session() -> tuple[requests.Session, str]:
+    """Create a session for the Automation Server API and get the API URL."""
     load_dotenv()
 
     url = os.getenv("ATS_URL")
@@ -21,34 +25,122 @@ def get_workqueue_items(workqueue: Workqueue, return_data=False):
     if not url or not token:
         raise OSError("ATS_URL or ATS_TOKEN is not set in the environment")
 
-    headers = {"Authorization": f"Bearer {token}"}
+    session = requests.Session()
+    session.headers.update({"Authorization": f"Bearer {token}"})
+    adapter = HTTPAdapter(pool_maxsize=config.ATS_PAGE_WORKERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session, url
 
-    workqueue_items = {} if return_data else set()
 
-    page = 1
-    size = 200  # max allowed
-
-    while True:
-        full_url = f"{url}/workqueues/{workqueue.id}/items?page={page}&size={size}"
-        response = requests.get(full_url, headers=headers, timeout=60)
-        response.raise_for_status()
+def iter_workqueue_items(
+    workqueue: Workqueue, return_data=False, start_page: int = 1
+) -> Iterator[str | tuple[str, dict]]:
+    """
+    Yield the items of a workqueue as their pages arrive.
 
-        res_json = response.json().get("items", [])
+    Items are requested in config.ATS_ITEM_ORDER, oldest first. The first page
+    tells how many pages there are. The rest are fetched concurrently by a
+    bounded pool and yielded in the order they complete.
+    If the API does not report the page count, pages are fetched one by one
+    until an empty page. start_page skips the pages before it.
 
-        if not res_json:
-            break
+    Yields:
+        str | tuple[str, dict]: The reference of each item, or the reference
+            and the item row if return_data is True.
+    """
+    session, url = _get_ats_session()
+    size = config.ATS_PAGE_SIZE
+    items_url = f"{url}/workqueues/{workqueue.id}/items"
+
+    def fetch_page(page: int) -> dict:
+        response = session.get(
+            items_url,
+            params={"page": page, "size": size, **config.ATS_ITEM_ORDER},
+            timeout=60,
+        )
+        response.raise_for_status()
+        return response.json()
 
-        for row in res_json:
+    def rows(res_json: dict) -> Iterator[str | tuple[str, dict]]:
+        for row in res_json.get("items", []):
             ref = row.get("reference")
             if ref:
-                if return_data:
-                    workqueue_items[ref] = row
-                else:
-                    workqueue_items.add(ref)
+                yield (ref, row) if return_data else ref
+
+    with session:
+        first = fetch_page(start_page)
+        yield from rows(first)
+
+        pages = first.get("pages")
+        if pages is None and first.get("total") is not None:
+            pages = math.ceil(first["total"] / size)
+
+        if pages is None:
+            page = start_page + 1
+            while True:
+                res_json = fetch_page(page)
+                if not res_json.get("items"):
+                    return
+                yield from rows(res_json)
+                page += 1
+
+        with ThreadPoolExecutor(max_workers=config.ATS_PAGE_WORKERS) as executor:
+            futures = [
+                executor.submit(fetch_page, p) for p in range(start_page + 1, pages + 1)
+            ]
+            try:
+                for future in as_completed(futures):
+                    yield from rows(future.result())
+            finally:
+                # Do not start pages nobody will read if the caller stops early
+                for future in futures:
+                    future.cancel()
+
+
+def get_workqueue_item_count(workqueue: Workqueue) -> int | None:
+    """Get the number of items in a workqueue, if the API reports it."""
+    session, url = _get_ats_session()
+    with session:
+        response = session.get(
+            f"{url}/workqueues/{workqueue.id}/items",
+            params={"page": 1, "size": 1},
+            timeout=60,
+        )
+        response.raise_for_status()
+        return response.json().get("total")
 
-        page += 1
 
-    return workqueue_items
+def get_workqueue_items(workqueue: Workqueue, return_data=False):
+    """
+    Retrieve items from the specified workqueue.
+    If the queue is empty, return an empty list.
+    """
+    if return_data:
+        return dict(iter_workqueue_items(workqueue, return_data=True))
+    return set(iter_workqueue_items(workqueue))
+
+
+def get_pending_items(workqueue: Workqueue) -> dict[str, dict]:
+    """
+    Get the rows of the items waiting in a workqueue, by reference.
+
+    The rows are streamed page by page and filtered on status as they arrive,
+    so only the pending items are kept in memory.
+    """
+    return {
+        reference: row
+        for reference, row in iter_workqueue_items(workqueue, return_data=True)
+        if str(row.get("status", "")).lower() == "new"
+    }
+
+
+def get_row_item_data(row: dict) -> dict:
+    """Unpack the item data of a workqueue item row from the API."""
+    data = row.get("data") or {}
+    if isinstance(data, str):
+        data = json.loads(data)
+    return (data.get("item") or {}).get("data") or {}
 
 
 def get_item_info(item: WorkItem):
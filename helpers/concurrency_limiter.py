@@ -0,0 +1,157 @@
+"""Adaptive limit on the number of concurrent calls to a backend"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Self
+
+from helpers import config
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on concurrent calls, used as an async context manager.
+
+    The limit starts at config.INITIAL_CONCURRENCY and stays between
+    config.MIN_CONCURRENCY and config.MAX_CONCURRENCY. Each call reports its
+    latency and whether it failed. The limit grows by one for every limit's
+    worth of fast successful calls, and is multiplied by
+    config.CONCURRENCY_BACKOFF_FACTOR when calls fail or get slow.
+    Calls fail when more than config.CONCURRENCY_MAX_ERROR_RATE of the last
+    config.CONCURRENCY_SHORT_WINDOW calls failed, so a single failure does not
+    shrink the limit. Calls are slow when the moving average latency of the
+    last config.CONCURRENCY_SHORT_WINDOW calls exceeds
+    config.CONCURRENCY_LATENCY_TOLERANCE times the baseline, the moving average
+    of the last config.CONCURRENCY_LONG_WINDOW calls. Comparing averages keeps
+    ordinary jitter of single calls from shrinking the limit. The baseline is
+    not updated while calls are slow, so sustained slowness keeps the limit
+    down instead of becoming the new baseline.
+    Decreases are at most once per config.CONCURRENCY_DECREASE_COOLDOWN, so a
+    burst of failures from calls started at the old limit counts once.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.floor = max(1, config.MIN_CONCURRENCY)
+        self.ceiling = max(self.floor, config.MAX_CONCURRENCY)
+        self._limit = float(
+            min(max(config.INITIAL_CONCURRENCY, self.floor), self.ceiling)
+        )
+        self._in_flight = 0
+        self._short_latency: float | None = None
+        self._baseline_latency: float | None = None
+        self._samples = 0
+        self._outcomes: deque[bool] = deque(maxlen=config.CONCURRENCY_SHORT_WINDOW)
+        self._last_decrease = float("-inf")
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        """The current limit on concurrent calls."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """The number of calls currently holding a slot."""
+        return self._in_flight
+
+    async def acquire(self) -> None:
+        """Wait for a free slot under the current limit."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def release(self) -> None:
+        """Free a slot."""
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    async def __aenter__(self) -> Self:
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.release()
+
+    async def run[T](self, call: Callable[[], Awaitable[T]]) -> T:
+        """Await a call in a slot and record its outcome."""
+        async with self:
+            started = time.monotonic()
+            try:
+                result = await call()
+            except Exception:
+                self.record(time.monotonic() - started, failed=True)
+                raise
+            self.record(time.monotonic() - started, failed=False)
+            return result
+
+    @property
+    def error_rate(self) -> float:
+        """The share of failed calls among the last short window of calls."""
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def record(self, latency: float, failed: bool) -> None:
+        """Adjust the limit from the outcome of a call."""
+        self._outcomes.append(failed)
+        failing = failed and self.error_rate > config.CONCURRENCY_MAX_ERROR_RATE
+        slow = not failed and self._observe(latency)
+
+        if failing or slow:
+            now = time.monotonic()
+            if now - self._last_decrease < config.CONCURRENCY_DECREASE_COOLDOWN:
+                return
+            self._last_decrease = now
+            reason = (
+                f"error rate {self.error_rate:.0%}"
+                if failing
+                else f"latency {self._short_latency:.2f}s, "
+                f"baseline {self._baseline_latency:.2f}s"
+            )
+            self._set_limit(self._limit * config.CONCURRENCY_BACKOFF_FACTOR, reason)
+        elif not failed:
+            self._set_limit(self._limit + 1 / self._limit, "calls healthy")
+
+    def _observe(self, latency: float) -> bool:
+        """Update the latency averages and check if calls have got slow."""
+        self._samples += 1
+        self._short_latency = _moving_average(
+            self._short_latency, latency, config.CONCURRENCY_SHORT_WINDOW
+        )
+        # Wait for a short window of calls before judging the average
+        slow = (
+            self._samples >= config.CONCURRENCY_SHORT_WINDOW
+            and self._baseline_latency is not None
+            and self._short_latency
+            > self._baseline_latency * config.CONCURRENCY_LATENCY_TOLERANCE
+        )
+        # Slow calls would drag the baseline up until they no longer look slow
+        if not slow:
+            self._baseline_latency = _moving_average(
+                self._baseline_latency, latency, config.CONCURRENCY_LONG_WINDOW
+            )
+        return slow
+
+    def _set_limit(self, limit: float, reason: str) -> None:
+        old = self.limit
+        self._limit = min(max(limit, self.floor), self.ceiling)
+        if self.limit != old:
+            logger.info(
+                "%s concurrency limit %d -> %d (%s)",
+                self.name,
+                old,
+                self.limit,
+                reason,
+            )
+
+
+def _moving_average(average: float | None, value: float, window: int) -> float:
+    """Exponential moving average over roughly the last window values."""
+    if average is None:
+        return value
+    alpha = 2 / (window + 1)
+    return average + alpha * (value - average)
@@ -5,16 +5,82 @@ MAX_RETRY = 10
 # ----------------------
 # Queue population settings
 # ----------------------
-MAX_CONCURRENCY = 100  # tune based on backend capacity
+MAX_CONCURRENCY = 100  # ceiling of the adaptive limit on concurrent adds
+MIN_CONCURRENCY = 4  # floor of the adaptive limit on concurrent adds
+INITIAL_CONCURRENCY = 20  # limit on concurrent adds before any are observed
+CONCURRENCY_LATENCY_TOLERANCE = 2.0  # back off when recent adds are this much slower
+CONCURRENCY_SHORT_WINDOW = 10  # adds averaged for the recent latency
+CONCURRENCY_LONG_WINDOW = 200  # adds averaged for the baseline latency
+CONCURRENCY_BACKOFF_FACTOR = 0.5  # limit is multiplied by this on failure or slowness
+CONCURRENCY_MAX_ERROR_RATE = 0.1  # share of failed recent adds tolerated
+CONCURRENCY_DECREASE_COOLDOWN = 2.0  # seconds between decreases of the limit
 MAX_RETRIES = 3  # transient failure retries per item
 RETRY_BASE_DELAY = 0.5  # seconds (exponential backoff)
+QUEUE_PROGRESS_INTERVAL = 10  # seconds between progress logs while adding items
+ATS_PAGE_SIZE = 200  # workqueue items per page (max allowed)
+ATS_ITEM_ORDER = {"order_by": "id", "order": "asc"}  # oldest items on the first pages
+ATS_PAGE_WORKERS = 8  # workqueue pages fetched concurrently
+QUEUE_CHUNK_SIZE = 500  # items read from the source and added to the queue at a time
+# Source of the items to queue. Not confirmed against the database schema, so
+# no items are read until QUEUE_SOURCE_TABLE is set to the verified table
+QUEUE_SOURCE_TABLE: str | None = None  # e.g. "[RPA].[journalizing].[Journalizing]"
+QUEUE_SOURCE_KEY_COLUMN = "form_id"  # unique and ordered, used as the item reference
+QUEUE_SOURCE_DATA_COLUMN = "form_data"  # JSON of the item data process_item reads
+QUEUE_SOURCE_STATUS_COLUMN = "status"
+QUEUE_SOURCE_PENDING_STATUS = "New"
+REFERENCE_INDEX_PATH = "C:\\Temp\\Journalizing\\reference_index.sqlite3"
+REFERENCE_INDEX_FULL_SYNC_INTERVAL = 7 * 24 * 3600  # seconds between full reconciles
+
+# ----------------------
+# RPA constants and credentials
+# ----------------------
+RPA_CACHE_TTL = 900  # seconds before a constant or credential is fetched again
+EXCEPTION_CATALOG_RETRY_DELAY = 600  # seconds before a failed catalog load is retried
+RPA_CONSTANTS = (  # preloaded at startup
+    "srvapptmtsql03_connection_string",
+    "srvsql59_connection_string",
+    "Error Email",
+    "Email Friend",
+    "smtp_server",
+    "smtp_port",
+)
+RPA_CREDENTIALS = (  # preloaded at startup
+    "os2_api",
+    "solteq_tand_svcrpambu001",
+)
 
 # ----------------------
 # Solteq Tand application settings
 # ----------------------
 APP_PATH = "C:\\Program Files (x86)\\TM Care\\TM Tand\\TMTand.exe"
+SESSION_REUSE = True  # keep the application logged in between items
+SESSION_MAX_ITEMS = 50  # items before the session is restarted
+SESSION_MAX_AGE = 4 * 3600  # seconds before the session is restarted
+APP_CLOSE_TIMEOUT = 10  # seconds to wait for the application to exit when closed
+APP_KILL_TIMEOUT = 10  # seconds to wait for the application to exit when killed
+WARM_STANDBY = False  # launch the replacement application before closing a failed one
+
+# ----------------------
+# Solteq Tand database settings
+# ----------------------
+SOLTEQ_DB_POOL_SIZE = 2  # connections kept open per connection string
+SOLTEQ_DB_MAX_OVERFLOW = 2  # extra connections allowed under load
+SOLTEQ_DB_POOL_TIMEOUT = 30  # seconds to wait for a free connection
+SOLTEQ_DB_POOL_RECYCLE = 1800  # seconds before a connection is replaced
+CLINIC_DIRECTORY_TTL = 3600  # seconds before the clinic table is loaded again
+CLINIC_DIRECTORY_MISS_REFRESH_INTERVAL = 300  # min. age before reloading on a miss
+PATIENT_PRESCAN_ENABLED = True  # check all queued items for existing documents up front
+PATIENT_PRESCAN_CHUNK_SIZE = 900  # CPR numbers per prescan query (max 2100 parameters)
 
 
+# ----------------------
+# Verification of GUI writes in the Solteq Tand database
+# ----------------------
+VERIFY_TIMEOUT = 30  # seconds before a write is considered failed
+VERIFY_INITIAL_DELAY = 0.25  # seconds between the first and second check
+VERIFY_MAX_DELAY = 4  # upper bound in seconds between checks
+VERIFY_BACKOFF = 2  # factor the delay grows by after each check
+
 # ----------------------
 # Document handling settings
 # ----------------------
@@ -41,3 +107,32 @@ DASHBOARD_STEP_4_NAME = "Formular indsendt"
 DASHBOARD_STEP_5_NAME = "Formular journaliseret"
 DASHBOARD_STEP_6_NAME = "Tandklinik registreret i Solteq"
 DASHBOARD_STEP_7_NAME = "Samtykke"
+DASHBOARD_STEP_NAMES = (
+    DASHBOARD_STEP_4_NAME,
+    DASHBOARD_STEP_5_NAME,
+    DASHBOARD_STEP_6_NAME,
+    DASHBOARD_STEP_7_NAME,
+)
+DASHBOARD_METADATA_TTL = 3600  # seconds before process/step IDs are looked up again
+DASHBOARD_RUNS_PAGE_SIZE = 100  # runs per page when prefetching the process runs
+DASHBOARD_RUNS_LOOKBACK_DAYS = (
+    365  # prefetch runs created this long before the oldest queued item
+)
+DASHBOARD_RUN_CACHE_TTL = 3600  # seconds before a prefetched run is looked up again
+
+# ----------------------
+# Dashboard API client settings
+# ----------------------
+DASHBOARD_POOL_SIZE = 4  # keep-alive connections kept open to the API
+DASHBOARD_MAX_RETRIES = 3  # retries on connection errors and 5xx responses
+DASHBOARD_RETRY_BACKOFF = 0.5  # seconds (exponential backoff)
+DASHBOARD_RETRY_JITTER = 0.5  # seconds of random jitter added to each backoff
+DASHBOARD_DEFAULT_TIMEOUT = 30  # seconds
+DASHBOARD_DRAIN_TIMEOUT = 60  # seconds to wait for queued step updates per item
+DASHBOARD_COALESCE_WINDOW = 2.0  # seconds to hold a step update for later changes
+DASHBOARD_TIMEOUTS = {  # seconds per API resource
+    "processes": 10,
+    "steps": 10,
+    "runs": 30,
+    "step-runs": 30,
+}
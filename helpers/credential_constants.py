@@ -1,10 +1,120 @@
 """Utility functions for RPA operations"""
 
+import logging
+import threading
+import time
+from collections.abc import Callable
 from typing import Any
 
 import pyodbc
 from mbu_dev_shared_components.database.connection import RPAConnection
 
+from helpers import config
+
+logger = logging.getLogger(__name__)
+
+# Constants and credentials are kept in memory only, keyed by (kind, name)
+_CACHE: dict[tuple[str, str], tuple[float, Any]] = {}
+_CACHE_LOCK = threading.Lock()
+# One lock per key, so a slow fetch only holds up lookups of the same value
+_LOAD_LOCKS: dict[tuple[str, str], threading.Lock] = {}
+
+
+def _get_fresh(key: tuple[str, str]) -> tuple[bool, Any]:
+    """Get a cached value if it is there and not expired."""
+    with _CACHE_LOCK:
+        cached = _CACHE.get(key)
+    if cached is not None and time.monotonic() - cached[0] < config.RPA_CACHE_TTL:
+        return True, cached[1]
+    return False, None
+
+
+def _get_cached(kind: str, name: str, load: Callable[[], Any]) -> Any:
+    """
+    Get a value from the cache, loading it if missing or expired.
+
+    Only found values are cached. An empty value is returned but looked up
+    again next time, and errors from load are raised as they are.
+    """
+    key = (kind, name)
+    found, value = _get_fresh(key)
+    if found:
+        return value
+
+    with _CACHE_LOCK:
+        load_lock = _LOAD_LOCKS.setdefault(key, threading.Lock())
+    with load_lock:
+        # Another thread may have loaded it while we waited
+        found, value = _get_fresh(key)
+        if found:
+            return value
+
+        value = load()
+        if value:
+            with _CACHE_LOCK:
+                _CACHE[key] = (time.monotonic(), value)
+        return value
+
+
+def invalidate_rpa_cache(name: str | None = None) -> None:
+    """
+    Drop cached constants and credentials, e.g. after an authentication failure.
+
+    Args:
+        name (str | None): Name of the constant or credential to drop.
+            Drops everything if None.
+    """
+    with _CACHE_LOCK:
+        if name is None:
+            _CACHE.clear()
+            return
+        for key in [key for key in _CACHE if key[1] == name]:
+            del _CACHE[key]
+    logger.info("Invalidated cached RPA value: %s", name)
+
+
+def preload_rpa_values(
+    constants: tuple[str, ...], credentials: tuple[str, ...]
+) -> None:
+    """
+    Fetch constants and credentials in a single RPAConnection session and
+    cache them, so later lookups are answered from memory.
+
+    Args:
+        constants (tuple[str, ...]): Names of the constants to fetch.
+        credentials (tuple[str, ...]): Names of the credentials to fetch.
+
+    Raises:
+        ValueError: If any of the constants or credentials is missing.
+    """
+    values: dict[tuple[str, str], Any] = {}
+    missing: list[str] = []
+
+    with RPAConnection(db_env="PROD", commit=False) as rpa_conn:
+        for name in constants:
+            try:
+                value = rpa_conn.get_constant(name).get("value", "")
+            except ValueError:
+                value = ""
+            if value:
+                values["constant", name] = value
+            else:
+                missing.append(name)
+
+        for name in credentials:
+            try:
+                values["credential", name] = rpa_conn.get_credential(name)
+            except ValueError:
+                missing.append(name)
+
+    if missing:
+        raise ValueError(f"Missing RPA constants or credentials: {', '.join(missing)}")
+
+    loaded_at = time.monotonic()
+    with _CACHE_LOCK:
+        _CACHE.update({key: (loaded_at, value) for key, value in values.items()})
+    logger.info("Preloaded %d RPA constants and credentials.", len(values))
+
 
 def get_rpa_constant(constant_name: str) -> str:
     """
@@ -16,8 +126,12 @@ def get_rpa_constant(constant_name: str) -> str:
     Returns:
         str: The constant value, empty string if not found
     """
-    with RPAConnection(db_env="PROD", commit=False) as rpa_conn:
-        return rpa_conn.get_constant(constant_name).get("value", "")
+
+    def load() -> str:
+        with RPAConnection(db_env="PROD", commit=False) as rpa_conn:
+            return rpa_conn.get_constant(constant_name).get("value", "")
+
+    return _get_cached("constant", constant_name, load)
 
 
 def get_rpa_credentials(credential_name: str) -> dict[str, Any]:
@@ -31,16 +145,20 @@ def get_rpa_credentials(credential_name: str) -> dict[str, Any]:
         dict[str, Any]: Dictionary containing username, password,
                        and other credential data
     """
-    with RPAConnection(db_env="PROD", commit=False) as rpa_conn:
-        return rpa_conn.get_credential(credential_name)
+
+    def load() -> dict[str, Any]:
+        with RPAConnection(db_env="PROD", commit=False) as rpa_conn:
+            return rpa_conn.get_credential(credential_name)
+
+    # Hand out a copy so callers cannot change the cached credential
+    return dict(_get_cached("credential", credential_name, load))
 
 
 def get_exceptions(db_connection: str) -> list[dict]:
     """Get exceptions from the database."""
     conn = pyodbc.connect(db_connection)
-    cursor = conn.cursor()
-
     try:
+        cursor = conn.cursor()
         cursor.execute(
             """
             SELECT
@@ -53,6 +171,7 @@ def get_exceptions(db_connection: str) -> list[dict]:
         rows = cursor.fetchall()
         columns = [column[0] for column in cursor.description]
         result = [dict(zip(columns, row, strict=True)) for row in rows]
+        cursor.close()
         return result
     finally:
-        cursor.close()
+        conn.close()
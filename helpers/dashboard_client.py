@@ -0,0 +1,97 @@
+"""Shared HTTP client for the process dashboard API"""
+
+import logging
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from helpers import config
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardClient:
+    """
+    Pooled keep-alive client for the process dashboard API.
+
+    All calls share one session, so TCP and TLS connections are reused.
+    Connection errors and 5xx responses are retried with jittered exponential
+    backoff, and every resource gets its own timeout from config.
+    """
+
+    def __init__(self, endpoint: str, api_key: str) -> None:
+        self.endpoint = endpoint.rstrip("/")
+
+        retry = Retry(
+            total=config.DASHBOARD_MAX_RETRIES,
+            backoff_factor=config.DASHBOARD_RETRY_BACKOFF,
+            backoff_jitter=config.DASHBOARD_RETRY_JITTER,
+            status_forcelist=(500, 502, 503, 504),
+            # Our PATCHes set absolute values, so they are safe to repeat
+            allowed_methods=frozenset({"GET", "PATCH"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=config.DASHBOARD_POOL_SIZE,
+            max_retries=retry,
+        )
+
+        self.session = requests.Session()
+        self.session.headers.update({"X-API-Key": api_key})
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def timeout_for(self, path: str) -> float:
+        """Get the timeout for a path based on the resource it targets."""
+        resource = path.lstrip("/").split("?", 1)[0].split("/", 1)[0]
+        return config.DASHBOARD_TIMEOUTS.get(resource, config.DASHBOARD_DEFAULT_TIMEOUT)
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """Send a request to a path relative to the dashboard endpoint."""
+        kwargs.setdefault("timeout", self.timeout_for(path))
+        return self.session.request(method, f"{self.endpoint}{path}", **kwargs)
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        """Send a GET request to the dashboard API."""
+        return self.request("GET", path, **kwargs)
+
+    def patch(self, path: str, **kwargs) -> requests.Response:
+        """Send a PATCH request to the dashboard API."""
+        return self.request("PATCH", path, **kwargs)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+
+CLIENT: DashboardClient | None = None
+
+
+def get_dashboard_client() -> DashboardClient:
+    """Get the dashboard client for this process run, creating it on first use."""
+    # noqa: PLW0602, PLW0603
+    global CLIENT
+    if CLIENT is None:
+        endpoint = os.environ.get("DASHBOARD_API_URL")
+        if not endpoint:
+            raise ValueError("DASHBOARD_API_URL environment variable not set.")
+
+        api_key = os.environ.get("API_ADMIN_TOKEN")
+        if not api_key:
+            raise ValueError("API_ADMIN_TOKEN environment variable not set.")
+
+        logger.info("Creating dashboard client for %s", endpoint)
+        CLIENT = DashboardClient(endpoint=endpoint, api_key=api_key)
+    return CLIENT
+
+
+def close_dashboard_client() -> None:
+    """Close the dashboard client if it has been created."""
+    # noqa: PLW0602, PLW0603
+    global CLIENT
+    if CLIENT is not None:
+        CLIENT.close()
+        CLIENT = None
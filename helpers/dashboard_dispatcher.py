@@ -0,0 +1,190 @@
+"""Background dispatcher for dashboard step run updates"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, replace
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StepRunUpdate:
+    """A single update of a dashboard step run."""
+
+    step_run_id: int
+    step_name: str
+    update_data: dict
+
+
+@dataclass
+class _PendingUpdate:
+    update: StepRunUpdate
+    due: float
+
+
+# Failure fields that identify a failure. Others, like the traceback in
+# details, differ between two raises of the same error.
+_FAILURE_FINGERPRINT_FIELDS = ("error_code", "code", "message")
+
+
+def _fingerprint(update_data: dict) -> tuple:
+    """The parts of an update that matter when comparing two updates."""
+    failure = update_data.get("failure")
+    if failure is not None:
+        failure = tuple(str(failure.get(name)) for name in _FAILURE_FINGERPRINT_FIELDS)
+    return (
+        update_data.get("status"),
+        failure,
+        repr(update_data.get("rerun_config")),
+    )
+
+
+class StepRunDispatcher:
+    """
+    Sends step run updates from a background thread.
+
+    Updates for the same step run that arrive within the coalescing window
+    are collapsed into the last one, keeping the started_at of the first.
+    An update that repeats what was last delivered for a step run is dropped.
+
+    A single worker sends updates in the order their step runs were first
+    queued, so the order per step run is kept. drain() sends everything
+    queued right away and hands back the updates that were not delivered.
+    """
+
+    def __init__(
+        self, send: Callable[[StepRunUpdate], None], window: float = 0.0
+    ) -> None:
+        self._send = send
+        self.window = window
+        self._cond = threading.Condition()
+        self._pending: dict[int, _PendingUpdate] = {}
+        self._in_flight = 0
+        self._draining = 0
+        self._failed: list[StepRunUpdate] = []
+        self._started_at: dict[int, str | None] = {}
+        self._last_sent: dict[int, tuple] = {}
+        self._worker: threading.Thread | None = None
+        self.coalesced = 0
+        self.duplicates_dropped = 0
+
+    def submit(self, update: StepRunUpdate) -> None:
+        """Queue an update for delivery, merging it with a queued one if present."""
+        with self._cond:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="step-run-dispatcher", daemon=True
+                )
+                self._worker.start()
+
+            key = update.step_run_id
+            started_at = self._started_at.setdefault(
+                key, update.update_data.get("started_at")
+            )
+            update = replace(
+                update, update_data={**update.update_data, "started_at": started_at}
+            )
+
+            pending = self._pending.get(key)
+            if pending is not None:
+                logger.info(
+                    "Coalescing update for step '%s' into status: %s",
+                    update.step_name,
+                    update.update_data.get("status"),
+                )
+                pending.update = update
+                self.coalesced += 1
+                return
+
+            self._pending[key] = _PendingUpdate(
+                update=update, due=time.monotonic() + self.window
+            )
+            self._cond.notify_all()
+
+    def drain(self, timeout: float) -> list[StepRunUpdate]:
+        """
+        Send all queued updates now and wait until they have been handled.
+
+        Args:
+            timeout (float): Maximum number of seconds to wait.
+
+        Returns:
+            list[StepRunUpdate]: Updates that could not be delivered, including
+                any still queued when the timeout ran out.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._draining += 1
+            self._cond.notify_all()
+            try:
+                while self._pending or self._in_flight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        logger.error(
+                            "Timed out draining dashboard updates. "
+                            "%d still queued, %d in flight.",
+                            len(self._pending),
+                            self._in_flight,
+                        )
+                        self._failed.extend(p.update for p in self._pending.values())
+                        self._pending.clear()
+                        break
+                    self._cond.wait(remaining)
+            finally:
+                self._draining -= 1
+
+            # Step runs belong to the item being drained, so forget them
+            self._started_at.clear()
+            self._last_sent.clear()
+            failed, self._failed = self._failed, []
+        return failed
+
+    def _next_due(self) -> _PendingUpdate:
+        """Wait for the oldest queued update to become due and take it."""
+        while True:
+            if not self._pending:
+                self._cond.wait()
+                continue
+
+            key, pending = next(iter(self._pending.items()))
+            wait = 0 if self._draining else pending.due - time.monotonic()
+            if wait <= 0:
+                del self._pending[key]
+                return pending
+            self._cond.wait(wait)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                update = self._next_due().update
+                fingerprint = _fingerprint(update.update_data)
+                if self._last_sent.get(update.step_run_id) == fingerprint:
+                    logger.info(
+                        "Dropping duplicate update for step '%s' with status: %s",
+                        update.step_name,
+                        update.update_data.get("status"),
+                    )
+                    self.duplicates_dropped += 1
+                    self._cond.notify_all()
+                    continue
+                self._in_flight += 1
+
+            try:
+                self._send(update)
+                with self._cond:
+                    self._last_sent[update.step_run_id] = fingerprint
+            except Exception as e:
+                logger.error(
+                    "Could not deliver update for step '%s' (step run %s): %s",
+                    update.step_name,
+                    update.step_run_id,
+                    e,
+                )
+                with self._cond:
+                    self._failed.append(update)
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
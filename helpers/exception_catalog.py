@@ -0,0 +1,148 @@
+"""Run-scoped catalog of the business exception messages"""
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from helpers import config
+from helpers.credential_constants import get_exceptions, get_rpa_constant
+
+logger = logging.getLogger(__name__)
+
+# Placeholders in catalog messages that match any text, e.g. {cpr} or %s
+_PLACEHOLDER = re.compile(r"\{[^{}]*\}|%[sd]")
+
+
+def normalize_message(message: str) -> str:
+    """Normalize a message for comparison: case-folded with single spaces."""
+    return " ".join(str(message or "").split()).casefold()
+
+
+def normalize_code(code: str) -> str:
+    """Normalize an exception code for comparison."""
+    return str(code or "").strip().upper()
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """A row of the BusinessExceptionMessages table."""
+
+    code: str
+    message: str
+
+
+class ExceptionCatalog:
+    """
+    Business exception messages indexed by code and message.
+
+    The table is loaded once per run. Messages with placeholders are compiled
+    to patterns, so classifying an error is an in-memory lookup. A failed load
+    is retried after config.EXCEPTION_CATALOG_RETRY_DELAY, not on every error.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._failed_at: float | None = None
+        self._by_code: dict[str, CatalogEntry] = {}
+        self._by_message: dict[str, CatalogEntry] = {}
+        self._patterns: list[tuple[re.Pattern, CatalogEntry]] = []
+
+    def load(self, rows: list[dict]) -> None:
+        """Build the indexes from rows with exception_code and message_text."""
+        by_code: dict[str, CatalogEntry] = {}
+        by_message: dict[str, CatalogEntry] = {}
+        patterns: list[tuple[re.Pattern, CatalogEntry]] = []
+
+        for row in rows:
+            entry = CatalogEntry(
+                code=str(row.get("exception_code") or ""),
+                message=str(row.get("message_text") or ""),
+            )
+            if entry.code:
+                by_code.setdefault(normalize_code(entry.code), entry)
+
+            message = normalize_message(entry.message)
+            if not message:
+                continue
+            if _PLACEHOLDER.search(message):
+                parts = _PLACEHOLDER.split(message)
+                pattern = ".+?".join(re.escape(part) for part in parts)
+                patterns.append((re.compile(f"^{pattern}$", re.DOTALL), entry))
+            else:
+                by_message.setdefault(message, entry)
+
+        with self._lock:
+            self._by_code = by_code
+            self._by_message = by_message
+            self._patterns = patterns
+            self._loaded = True
+        logger.info("Exception catalog loaded with %d messages.", len(rows))
+
+    def ensure_loaded(self, db_connection: str) -> None:
+        """
+        Load the catalog from the database unless it is already loaded or the
+        last attempt failed too recently.
+        """
+        with self._lock:
+            if self._loaded:
+                return
+            if (
+                self._failed_at is not None
+                and time.monotonic() - self._failed_at
+                < config.EXCEPTION_CATALOG_RETRY_DELAY
+            ):
+                return
+        try:
+            rows = get_exceptions(db_connection)
+        except Exception:
+            with self._lock:
+                self._failed_at = time.monotonic()
+            raise
+        self.load(rows)
+
+    def classify(self, error: Exception) -> CatalogEntry | None:
+        """
+        Find the catalog entry of an error.
+
+        The error's code attribute is tried first, then its message, first as
+        an exact match and then against the message patterns.
+
+        Returns:
+            CatalogEntry | None: The matching entry, if any.
+        """
+        code = getattr(error, "code", None) or getattr(error, "error_code", None)
+        message = normalize_message(getattr(error, "message", None) or str(error))
+
+        with self._lock:
+            if code and normalize_code(code) in self._by_code:
+                return self._by_code[normalize_code(code)]
+            if message in self._by_message:
+                return self._by_message[message]
+            for pattern, entry in self._patterns:
+                if pattern.match(message):
+                    return entry
+        return None
+
+
+_CATALOG = ExceptionCatalog()
+
+
+def get_exception_catalog() -> ExceptionCatalog:
+    """
+    Get the run-scoped exception catalog, loading it on first use.
+
+    Failing to load is not fatal, as errors are then reported unclassified.
+    """
+    try:
+        _CATALOG.ensure_loaded(get_rpa_constant("srvsql59_connection_string"))
+    except Exception as e:
+        logger.warning("Could not load exception catalog: %s", e)
+    return _CATALOG
+
+
+def classify_error(error: Exception) -> CatalogEntry | None:
+    """Find the catalog entry of an error, if any."""
+    return get_exception_catalog().classify(error)
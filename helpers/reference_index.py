@@ -0,0 +1,144 @@
+"""Local index of the references already in a workqueue"""
+
+import logging
+import os
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+
+from automation_server_client import Workqueue
+
+from helpers import ats_functions, config
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceIndex:
+    """
+    On-disk index of the references queued per workqueue.
+
+    The highest item ID seen at the last sync is kept as a high-water mark,
+    with the item count at the time. Workqueue items are listed oldest first
+    (config.ATS_ITEM_ORDER), so a sync only reads from the page that held the
+    last seen item. If that page starts after the high-water mark, items were
+    deleted and new ones may have moved to earlier pages, so the full queue is
+    reconciled instead. A full reconcile also runs when the index is new, or
+    when the last one is older than config.REFERENCE_INDEX_FULL_SYNC_INTERVAL.
+    """
+
+    def __init__(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Lookups run from the queue producer's thread, one at a time
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS queue_references (
+                    workqueue_id INTEGER NOT NULL,
+                    reference TEXT NOT NULL,
+                    PRIMARY KEY (workqueue_id, reference)
+                )
+                """
+            )
+            # Replaced by sync_marks, which adds the high-water mark item ID
+            self.conn.execute("DROP TABLE IF EXISTS sync_state")
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sync_marks (
+                    workqueue_id INTEGER PRIMARY KEY,
+                    item_count INTEGER NOT NULL,
+                    last_item_id INTEGER NOT NULL,
+                    full_sync_at REAL NOT NULL
+                )
+                """
+            )
+
+    def close(self) -> None:
+        """Close the index file."""
+        self.conn.close()
+
+    def add(self, workqueue_id: int, references: Iterable[str]) -> None:
+        """Record references as queued."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO queue_references VALUES (?, ?)",
+                ((workqueue_id, str(reference)) for reference in references),
+            )
+
+    def existing(self, workqueue_id: int, references: Iterable[str]) -> set[str]:
+        """Get those of the references that are already queued."""
+        found: set[str] = set()
+        references = list(references)
+        # Stay below SQLite's limit on parameters per statement
+        for start in range(0, len(references), 500):
+            chunk = references[start : start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self.conn.execute(
+                "SELECT reference FROM queue_references "
+                f"WHERE workqueue_id = ? AND reference IN ({placeholders})",
+                (workqueue_id, *chunk),
+            )
+            found.update(row[0] for row in rows)
+        return found
+
+    def sync(self, workqueue: Workqueue) -> None:
+        """Bring the index up to date with the items of the workqueue."""
+        item_count = ats_functions.get_workqueue_item_count(workqueue)
+        state = self.conn.execute(
+            "SELECT item_count, last_item_id, full_sync_at FROM sync_marks "
+            "WHERE workqueue_id = ?",
+            (workqueue.id,),
+        ).fetchone()
+
+        rows: list[tuple[str, dict]] = []
+        full = (
+            state is None
+            or item_count is None
+            or time.time() - state[2] > config.REFERENCE_INDEX_FULL_SYNC_INTERVAL
+        )
+        if not full:
+            # Re-read the page that held the last seen item, as it may have filled up
+            start_page = max(state[0] - 1, 0) // config.ATS_PAGE_SIZE + 1
+            logger.info("Syncing reference index from page %d.", start_page)
+            rows = list(
+                ats_functions.iter_workqueue_items(
+                    workqueue, return_data=True, start_page=start_page
+                )
+            )
+            first_id = min(_item_ids(rows), default=None)
+            if start_page > 1 and (first_id is None or first_id > state[1]):
+                logger.info("Workqueue items were deleted since the last sync.")
+                full = True
+
+        if full:
+            logger.info("Reconciling reference index with the full workqueue.")
+            rows = list(ats_functions.iter_workqueue_items(workqueue, return_data=True))
+            with self.conn:
+                self.conn.execute(
+                    "DELETE FROM queue_references WHERE workqueue_id = ?",
+                    (workqueue.id,),
+                )
+                self.add(workqueue.id, (reference for reference, _ in rows))
+            full_sync_at = time.time()
+            last_item_id = max(_item_ids(rows), default=0)
+        else:
+            self.add(workqueue.id, (reference for reference, _ in rows))
+            full_sync_at = state[2]
+            last_item_id = max(_item_ids(rows), default=state[1])
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_marks VALUES (?, ?, ?, ?)",
+                (workqueue.id, item_count or 0, last_item_id, full_sync_at),
+            )
+        logger.info(
+            "Reference index synced with %d references read from the workqueue.",
+            len(rows),
+        )
+
+
+def _item_ids(rows: Iterable[tuple[str, dict]]) -> Iterator[int]:
+    """Get the IDs of workqueue item rows that have one."""
+    for _, row in rows:
+        if row.get("id") is not None:
+            yield int(row["id"])
@@ -0,0 +1,174 @@
+"""Pooled connections to the Solteq Tand database"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+
+import pyodbc
+from mbu_dev_shared_components.solteqtand.database import SolteqTandDatabase
+from sqlalchemy import create_engine
+
+from helpers import config
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from sqlalchemy.engine import Engine
+    from sqlalchemy.pool import PoolProxiedConnection
+
+logger = logging.getLogger(__name__)
+
+
+class PooledSolteqTandDatabase(SolteqTandDatabase):
+    """
+    SolteqTandDatabase that takes its connections from a shared pool instead
+    of opening a new ODBC connection for every query.
+
+    Inside checkout() all queries in the current context run on one pinned
+    connection, so an item pays for at most one checkout.
+    """
+
+    def __init__(self, conn_str: str, engine: Engine) -> None:
+        super().__init__(conn_str=conn_str)
+        self.engine = engine
+        self._pinned: ContextVar[PoolProxiedConnection | None] = ContextVar(
+            f"solteq_connection_{id(self)}", default=None
+        )
+
+    @contextmanager
+    def checkout(self) -> Iterator[None]:
+        """Pin one pooled connection to the current context until exit."""
+        conn = self.engine.raw_connection()
+        token = self._pinned.set(conn)
+        try:
+            yield
+        finally:
+            self._pinned.reset(token)
+            conn.close()
+
+    @contextmanager
+    def _cursor(self) -> Iterator[pyodbc.Cursor]:
+        """Get a cursor on the pinned connection, or on a pooled one if none is pinned."""
+        pinned = self._pinned.get()
+        use_pinned = pinned is not None and pinned.is_valid
+        conn = pinned if use_pinned else self.engine.raw_connection()
+
+        try:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+        except pyodbc.Error:
+            # Do not hand a broken connection back to the pool
+            conn.invalidate()
+            raise
+        finally:
+            if not use_pinned:
+                conn.close()
+
+    def _execute_query(self, query: str, params: tuple):
+        with self._cursor() as cursor:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            columns = [column[0] for column in cursor.description]
+
+        return [dict(zip(columns, row, strict=True)) for row in rows]
+
+    def fetch_batch(self, queries: list[tuple[str, dict]]) -> list[list[dict]]:
+        """
+        Run several of the list queries in a single round-trip.
+
+        Args:
+            queries (list[tuple[str, dict]]): Pairs of query method name and its
+                keyword arguments, e.g. ("get_list_of_documents", {"filters": {...}}).
+
+        Returns:
+            list[list[dict]]: The rows of each query, in the order given.
+        """
+        recorder = _StatementRecorder()
+        for method_name, kwargs in queries:
+            getattr(recorder, method_name)(**kwargs)
+
+        # Statements are terminated so the CTE in the document query stays valid
+        batch = "SET NOCOUNT ON;\n" + ";\n".join(
+            query.strip() for query, _ in recorder.statements
+        )
+        params = [
+            param for _, query_params in recorder.statements for param in query_params
+        ]
+
+        results: list[list[dict]] = []
+        with self._cursor() as cursor:
+            cursor.execute(batch, params)
+            while True:
+                if cursor.description:
+                    columns = [column[0] for column in cursor.description]
+                    results.append(
+                        [
+                            dict(zip(columns, row, strict=True))
+                            for row in cursor.fetchall()
+                        ]
+                    )
+                if not cursor.nextset():
+                    break
+
+        if len(results) != len(queries):
+            raise RuntimeError(
+                f"Expected {len(queries)} result sets from batch, got {len(results)}."
+            )
+        return results
+
+
+class _StatementRecorder(SolteqTandDatabase):
+    """Records the SQL the SolteqTandDatabase query methods would run."""
+
+    def __init__(self) -> None:
+        super().__init__(conn_str="")
+        self.statements: list[tuple[str, list]] = []
+
+    def _execute_query(self, query: str, params: tuple):
+        self.statements.append((query, list(params)))
+        return []
+
+
+_DATABASES: dict[str, PooledSolteqTandDatabase] = {}
+_LOCK = threading.Lock()
+
+
+def _create_engine(conn_str: str) -> Engine:
+    """Create a pooled engine for an ODBC connection string."""
+    return create_engine(
+        "mssql+pyodbc://",
+        creator=lambda: pyodbc.connect(conn_str, autocommit=True),
+        pool_size=config.SOLTEQ_DB_POOL_SIZE,
+        max_overflow=config.SOLTEQ_DB_MAX_OVERFLOW,
+        pool_timeout=config.SOLTEQ_DB_POOL_TIMEOUT,
+        pool_recycle=config.SOLTEQ_DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+
+
+def get_solteq_database(conn_str: str) -> PooledSolteqTandDatabase:
+    """Get the process-wide pooled database object for a connection string."""
+    with _LOCK:
+        database = _DATABASES.get(conn_str)
+        if database is None:
+            logger.info("Creating connection pool for Solteq Tand database.")
+            database = PooledSolteqTandDatabase(
+                conn_str=conn_str, engine=_create_engine(conn_str)
+            )
+            _DATABASES[conn_str] = database
+        return database
+
+
+def dispose_solteq_databases() -> None:
+    """Close all pooled Solteq Tand connections."""
+    with _LOCK:
+        for database in _DATABASES.values():
+            database.engine.dispose()
+        _DATABASES.clear()
@@ -0,0 +1,100 @@
+"""Polling helper to verify that writes made through the GUI are visible"""
+
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from helpers import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PollStats:
+    """Observed latencies of one kind of verification."""
+
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    timeouts: int = 0
+
+    @property
+    def mean(self) -> float:
+        """Mean latency in seconds of successful verifications."""
+        return self.total / self.count if self.count else 0.0
+
+    def record(self, latency: float) -> None:
+        """Record the latency of a successful verification."""
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+
+_STATS: dict[str, PollStats] = {}
+
+
+def get_poll_stats() -> dict[str, PollStats]:
+    """Get the observed latencies per verification description."""
+    return _STATS
+
+
+def poll_until[T](
+    check: Callable[[], T],
+    description: str,
+    *,
+    timeout: float = config.VERIFY_TIMEOUT,
+    initial_delay: float = config.VERIFY_INITIAL_DELAY,
+    max_delay: float = config.VERIFY_MAX_DELAY,
+) -> T:
+    """
+    Call check until it returns a truthy value, backing off exponentially.
+
+    The first check runs immediately, so the caller moves on as soon as the
+    write is visible. The wait grows by config.VERIFY_BACKOFF after each check.
+
+    Args:
+        check (Callable[[], T]): Predicate to poll, e.g. a database lookup.
+        description (str): What is being verified. Used in logs and stats.
+        timeout (float): Seconds before giving up.
+        initial_delay (float): Seconds to wait after the first failed check.
+        max_delay (float): Upper bound in seconds for the wait between checks.
+
+    Returns:
+        T: The first truthy result of check.
+
+    Raises:
+        TimeoutError: If check is still falsy when the timeout runs out.
+    """
+    stats = _STATS.setdefault(description, PollStats())
+    start = time.monotonic()
+    deadline = start + timeout
+    delay = initial_delay
+    attempts = 0
+
+    while True:
+        attempts += 1
+        result = check()
+        if result:
+            latency = time.monotonic() - start
+            stats.record(latency)
+            logger.info(
+                "%s verified after %.2fs and %d attempts (mean %.2fs, max %.2fs).",
+                description,
+                latency,
+                attempts,
+                stats.mean,
+                stats.max,
+            )
+            return result
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            stats.timeouts += 1
+            raise TimeoutError(
+                f"{description} not verified within {timeout:g}s "
+                f"after {attempts} attempts."
+            )
+
+        time.sleep(min(delay, remaining))
+        delay = min(delay * config.VERIFY_BACKOFF, max_delay)
@@ -3,8 +3,10 @@ This is the main entry point for the process
 """
 
 import asyncio
+import itertools
 import logging
 import sys
+from collections.abc import Iterator
 
 from automation_server_client import AutomationServer, Workqueue
 from mbu_rpa_core.exceptions import BusinessError, ProcessError
@@ -12,12 +14,28 @@ from mbu_rpa_core.process_states import CompletedState
 
 from helpers import ats_functions, config
 from helpers.context_handler import Scope
-from processes.application_handler import close, reset, startup
+from helpers.credential_constants import get_rpa_constant
+from helpers.dashboard_client import close_dashboard_client
+from helpers.reference_index import ReferenceIndex
+from helpers.solteq_database import dispose_solteq_databases, get_solteq_database
+from processes.application_handler import (
+    close,
+    discard_standby,
+    reset,
+    start_standby,
+    startup,
+)
 from processes.error_handling import ErrorContext, handle_error
 from processes.finalize_process import finalize_process
 from processes.process_item import process_item
 from processes.queue_handler import concurrent_add, retrieve_items_for_queue
 from processes.sub_processes.clean_up import clean_up
+from processes.sub_processes.handlers.dashboard_data_handler import (
+    prefetch_dashboard_runs,
+)
+from processes.sub_processes.handlers.patient_snapshot_handler import (
+    prescan_pending_items,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,23 +45,35 @@ async def populate_queue(workqueue: Workqueue):
 
     logger.info("Populating workqueue...")
 
-    items_to_queue = retrieve_items_for_queue()
-
-    queue_references = {str(r) for r in ats_functions.get_workqueue_items(workqueue)}
+    # Only read the queue items created since the last run
+    reference_index = ReferenceIndex(config.REFERENCE_INDEX_PATH)
+    try:
+        reference_index.sync(workqueue)
+
+        def new_items() -> Iterator[dict]:
+            """Yield the source items not already in the queue, chunk by chunk."""
+            for chunk in itertools.batched(
+                retrieve_items_for_queue(), config.QUEUE_CHUNK_SIZE, strict=False
+            ):
+                queue_references = reference_index.existing(
+                    workqueue.id, (str(item.get("reference") or "") for item in chunk)
+                )
+                for item in chunk:
+                    reference = str(item.get("reference") or "")
+                    if reference and reference in queue_references:
+                        logger.info(
+                            "Reference: %s already in queue. Item: %s not added",
+                            reference,
+                            item,
+                        )
+                    else:
+                        yield item
 
-    new_items: list[dict] = []
-    for item in items_to_queue:
-        reference = str(item.get("reference") or "")
-        if reference and reference in queue_references:
-            logger.info(
-                "Reference: %s already in queue. Item: %s not added",
-                reference,
-                item,
-            )
-        else:
-            new_items.append(item)
+        added = await concurrent_add(workqueue, new_items())
+        reference_index.add(workqueue.id, (ref for ref in added if ref))
+    finally:
+        reference_index.close()
 
-    await concurrent_add(workqueue, new_items)
     logger.info("Finished populating workqueue.")
 
 
@@ -52,8 +82,26 @@ async def process_workqueue(workqueue: Workqueue):
 
     logger.info("Processing workqueue...")
 
+    # Read the pending items once, for the dashboard prefetch and the prescan
+    try:
+        pending_items = ats_functions.get_pending_items(workqueue)
+    except Exception as e:
+        logger.warning("Could not read the pending items of the queue: %s", e)
+        pending_items = {}
+
+    # Index the dashboard runs of the queued items instead of looking them up per item
+    prefetch_dashboard_runs(pending_items)
+
+    # Preloads the RPA constants and credentials while the application launches
     startup()
 
+    # Check all pending items for existing documents and notes in a few queries
+    prescan_pending_items(pending_items)
+
+    solteq_db = get_solteq_database(
+        get_rpa_constant("srvapptmtsql03_connection_string")
+    )
+
     error_count = 0
 
     while error_count < config.MAX_RETRY:
@@ -72,8 +120,9 @@ async def process_workqueue(workqueue: Workqueue):
                         # Ensure all temp files are cleaned up before processing
                         clean_up()
 
-                        # Process the item within a fresh context
-                        with Scope(fresh=True):
+                        # Process the item within a fresh context, on one pooled
+                        # Solteq Tand database connection
+                        with Scope(fresh=True), solteq_db.checkout():
                             process_item(item_data, item_reference, item_id)
 
                         completed_state = CompletedState.completed(
@@ -112,13 +161,19 @@ async def process_workqueue(workqueue: Workqueue):
                     log=logger.error,
                     context=context,
                 )
+                # Launch the replacement only now, so the error screenshot
+                # shows the failed application and not the one starting up
+                start_standby()
                 error_count += 1
                 reset()
 
         break
 
     logger.info("Finished processing workqueue.")
+    discard_standby()
     close()
+    close_dashboard_client()
+    dispose_solteq_databases()
 
 
 async def finalize(workqueue: Workqueue):
@@ -1,17 +1,59 @@
 """Module for handling application startup, and close"""
 
+from __future__ import annotations
+
 import logging
-import subprocess as sp
-from subprocess import CalledProcessError
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
 
-from mbu_dev_shared_components.solteqtand.application import SolteqTandApp
+import psutil
 
 from helpers import config
-from helpers.credential_constants import get_rpa_credentials
+from helpers.credential_constants import (
+    get_rpa_credentials,
+    invalidate_rpa_cache,
+    preload_rpa_values,
+)
+
+if TYPE_CHECKING:
+    from mbu_dev_shared_components.solteqtand.application import SolteqTandApp
 
 logger = logging.getLogger(__name__)
 
+# Launches the application and returns its handler and process, without logging in
+type AppFactory = Callable[[], tuple[SolteqTandApp, psutil.Process | None]]
+
 APP: SolteqTandApp | None = None
+APP_PROCESS: psutil.Process | None = None
+SESSION_STARTED_AT: float | None = None
+SESSION_ITEM_COUNT = 0
+STANDBY: tuple[SolteqTandApp, psutil.Process | None] | None = None
+
+
+def launch_solteq_tand() -> tuple[SolteqTandApp, psutil.Process | None]:
+    """Launch TMTand.exe and create the application handler for it."""
+    # Imported here so the lifecycle can run without the Windows UI libraries
+    from mbu_dev_shared_components.solteqtand.application import (  # noqa: PLC0415
+        SolteqTandApp,
+    )
+
+    application = SolteqTandApp(app_path=config.APP_PATH)
+    # Launch the executable ourselves to hold on to its process. The handle
+    # remembers the start time, so a reused PID is not mistaken for it later.
+    process = psutil.Popen([config.APP_PATH])
+    return application, process
+
+
+APP_FACTORY: AppFactory = launch_solteq_tand
+
+
+def set_app_factory(factory: AppFactory) -> None:
+    """Replace how the application is launched, e.g. with a stand-in in tests."""
+    # noqa: PLW0602, PLW0603
+    global APP_FACTORY
+    APP_FACTORY = factory
 
 
 def get_app():
@@ -21,30 +63,81 @@ def get_app():
     return APP
 
 
-def startup():
-    """Function for starting applications"""
+def startup(launched_app: tuple[SolteqTandApp, psutil.Process | None] | None = None):
+    """
+    Function for starting applications
+
+    Args:
+        launched_app: An already launched application and its process, e.g. the
+            warm standby, to log in to instead of launching a new one.
+    """
+    # noqa: PLW0602, PLW0603
+    global APP, APP_PROCESS, SESSION_STARTED_AT, SESSION_ITEM_COUNT
     logger.info("Starting applications...")
 
     logger.info("Starting Solteq Tand application...")
+    launched = False
     try:
-        creds = get_rpa_credentials("solteq_tand_svcrpambu001")
+        # Fetch all constants and credentials while the application launches
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            preload = executor.submit(
+                preload_rpa_values, config.RPA_CONSTANTS, config.RPA_CREDENTIALS
+            )
+            application, APP_PROCESS = launched_app or APP_FACTORY()
+            launched = True
+            preload.result()
 
-        application = SolteqTandApp(
-            app_path=config.APP_PATH,
-            username=creds["username"],
-            password=creds["decrypted_password"],
-        )
-        application.start_application()
+        creds = get_rpa_credentials("solteq_tand_svcrpambu001")
+        application.username = creds["username"]
+        application.password = creds["decrypted_password"]
         application.login()
 
-        # noqa: PLW0602, PLW0603
-        global APP
         APP = application
+        SESSION_STARTED_AT = time.monotonic()
+        SESSION_ITEM_COUNT = 0
     except Exception as e:
         logger.error("Failed to start Solteq Tand application: %s", e)
+        # The password may have been rotated, so fetch it again next time
+        invalidate_rpa_cache("solteq_tand_svcrpambu001")
+        if launched:
+            hard_close(application="TMTand.exe")
+            APP_PROCESS = None
         raise
 
 
+def start_standby():
+    """
+    Launch a replacement application in the background, so reset() can switch
+    to it instead of waiting for a new launch. Does nothing unless
+    config.WARM_STANDBY is set or if a standby is already launched.
+    """
+    # noqa: PLW0602, PLW0603
+    global STANDBY
+    if not config.WARM_STANDBY or STANDBY is not None:
+        return
+
+    logger.info("Launching standby Solteq Tand application...")
+    try:
+        STANDBY = APP_FACTORY()
+    except Exception as e:
+        logger.warning("Could not launch standby Solteq Tand application: %s", e)
+
+
+def discard_standby():
+    """Kill the standby application, if one is launched."""
+    # noqa: PLW0602, PLW0603
+    global STANDBY
+    if STANDBY is None:
+        return
+
+    _, process = STANDBY
+    STANDBY = None
+    if process is None or not _is_alive(process):
+        return
+    logger.info("Discarding standby Solteq Tand application...")
+    _kill([process], "TMTand.exe")
+
+
 def soft_close():
     """Function for closing applications softly"""
     logger.info("Closing applications softly...")
@@ -52,38 +145,177 @@ def soft_close():
     logger.info("Closing Solteq Tand application softly...")
     application = get_app()
     try:
-        application.close_solteq_tand()
+        # Not close_solteq_tand(), which asserts that no TMTand.exe runs at
+        # all and so fails while a standby runs. Only our process must exit.
+        if application.app_window:
+            application.close_window(application.app_window)
+            application.app_window = None
+        if APP_PROCESS is not None:
+            APP_PROCESS.wait(timeout=config.APP_CLOSE_TIMEOUT)
         logger.info("Closed application softly")
     except Exception as e:
         logger.error("Could not close application softly: %s", e)
 
 
-def hard_close(application: str):
-    """Function for closing applications hard"""
-    logger.info("Hard closing %s...", application)
-    list_processes = ["wmic", "process", "get", "description"]
-    if f"{application}" in sp.check_output(list_processes).strip().decode():
+def _is_alive(process: psutil.Process) -> bool:
+    """Check if a process is alive, and not a new process reusing its PID."""
+    try:
+        return process.is_running() and process.status() != psutil.STATUS_ZOMBIE
+    except psutil.Error:
+        return False
+
+
+def is_running() -> bool:
+    """Check if the launched application process is still alive."""
+    return APP_PROCESS is not None and _is_alive(APP_PROCESS)
+
+
+def _kill(processes: list[psutil.Process], application: str) -> None:
+    """Kill processes and wait a bounded time for them to exit."""
+    for process in processes:
         try:
-            kill_msg = sp.check_output(["taskkill", "/f", "/im", f"{application}"])
-            logger.info(kill_msg)
-        except CalledProcessError as e:
+            process.kill()
+        except psutil.NoSuchProcess:
+            continue
+        except psutil.Error as e:
             logger.error(
-                f"{application} found in subprocesses, but error while killing it: %s",
-                e,
+                "Error while killing %s (PID %s): %s", application, process.pid, e
             )
 
+    _, alive = psutil.wait_procs(processes, timeout=config.APP_KILL_TIMEOUT)
+    for process in alive:
+        logger.error("%s (PID %s) did not exit after kill.", application, process.pid)
+
+
+def hard_close(application: str):
+    """
+    Function for closing applications hard
+
+    Kills the launched process and waits for it to exit. Falls back to
+    killing processes by name if the process is not known.
+    """
+    logger.info("Hard closing %s...", application)
+    if APP_PROCESS is not None:
+        processes = [APP_PROCESS] if _is_alive(APP_PROCESS) else []
+    else:
+        standby = STANDBY[1] if STANDBY is not None else None
+        standby_pid = standby.pid if standby is not None else None
+        processes = [
+            p
+            for p in psutil.process_iter(["name"])
+            if (p.info["name"] or "").lower() == application.lower()
+            and p.pid != standby_pid
+        ]
+    _kill(processes, application)
+
 
 def close():
     """Function for closing applications softly or hardly if necessary"""
+    # noqa: PLW0602, PLW0603
+    global APP, APP_PROCESS
     solteq_app = get_app()
+    if solteq_app is None and APP_PROCESS is None:
+        # Nothing was launched, so do not kill other instances by name
+        return
     if solteq_app:
         soft_close()
-    solteq_app = get_app()
-    if solteq_app:
+    if APP_PROCESS is None or is_running():
         hard_close(application="TMTand.exe")
+    APP = None
+    APP_PROCESS = None
 
 
 def reset():
-    """Function for resetting application"""
+    """
+    Function for resetting application
+
+    Switches to the warm standby if one is launched, and launches a new
+    application otherwise.
+    """
+    # noqa: PLW0602, PLW0603
+    global STANDBY
+    # Keep the standby registered while closing, so it is not killed by name
     close()
+    standby, STANDBY = STANDBY, None
+
+    if standby is None:
+        startup()
+        return
+
+    logger.info("Switching to standby Solteq Tand application...")
+    try:
+        startup(launched_app=standby)
+    except Exception as e:
+        logger.warning("Standby application failed, launching a new one: %s", e)
+        startup()
+
+
+def is_healthy() -> bool:
+    """Check if the application process is alive and its window is responding."""
+    application = get_app()
+    if application is None or application.app_window is None or not is_running():
+        return False
+    try:
+        return bool(application.app_window.Exists(0, 0))
+    except Exception as e:
+        logger.warning("Solteq Tand health check failed: %s", e)
+        return False
+
+
+def ensure_session():
+    """Make sure a logged in application is ready, restarting it if it is not."""
+    if is_healthy():
+        return
+
+    logger.info("No healthy Solteq Tand session. Starting a new one...")
+    if get_app() is not None:
+        close()
     startup()
+
+
+def prepare_session_for_next_item():
+    """
+    Return the application to its main window after an item, so the session
+    can be reused to open the next patient. The application is closed instead
+    if session reuse is off, the session is due for recycling, or it is not
+    back on the main window afterwards.
+    """
+    if not config.SESSION_REUSE:
+        close()
+        return
+
+    # noqa: PLW0602, PLW0603
+    global SESSION_ITEM_COUNT
+    SESSION_ITEM_COUNT += 1
+
+    age = time.monotonic() - (SESSION_STARTED_AT or 0)
+    if SESSION_ITEM_COUNT >= config.SESSION_MAX_ITEMS or age >= config.SESSION_MAX_AGE:
+        logger.info(
+            "Recycling Solteq Tand session after %d items and %.0f seconds.",
+            SESSION_ITEM_COUNT,
+            age,
+        )
+        close()
+        return
+
+    application = get_app()
+    try:
+        if application is None or application.app_window is None:
+            raise RuntimeError("Application is not running.")
+        if application.app_window.AutomationId == "FormPatient":
+            application.close_patient_window()
+        # Any other window, e.g. a dialog left open, cannot be reused safely
+        window = application.app_window
+        if (
+            window is None
+            or window.AutomationId != "FormFront"
+            or not window.Exists(0, 0)
+        ):
+            raise RuntimeError(
+                "Application is not on the main window: "
+                f"{getattr(window, 'AutomationId', None)}"
+            )
+        logger.info("Solteq Tand session ready for the next item.")
+    except Exception as e:
+        logger.warning("Could not reset Solteq Tand session, closing it: %s", e)
+        close()
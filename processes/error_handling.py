@@ -9,10 +9,12 @@ from email.message import EmailMessage
 from io import BytesIO
 
 from automation_server_client import WorkItem
-from mbu_dev_shared_components.database.connection import RPAConnection
 from mbu_rpa_core.exceptions import BusinessError, ProcessError
 from PIL import ImageGrab
 
+from helpers.credential_constants import get_rpa_constant
+from helpers.exception_catalog import classify_error
+
 
 @dataclass
 class ErrorContext:
@@ -44,7 +46,12 @@ def handle_error(
     """
     if context is None:
         context = ErrorContext()
-    error_json = json.dumps(error.__dictinfo__())
+    error_info = error.__dictinfo__()
+    if isinstance(error, BusinessError):
+        entry = classify_error(error)
+        if entry is not None:
+            error_info["exception_code"] = entry.code
+    error_json = json.dumps(error_info)
     log_msg = f"Error: {error}"
     if context.item:
         log_msg = f"{repr(error)} raised for item: {context.item}. " + log_msg
@@ -75,14 +82,10 @@ def send_error_email(
     Raises:
         Exception: If sending the email fails.
     """
-    rpa_conn = RPAConnection(db_env="PROD", commit=False)
-    with rpa_conn:
-        error_email = rpa_conn.get_constant("Error Email")["value"]
-        error_sender = rpa_conn.get_constant("Email Friend")[
-            "value"
-        ]  # Find in database...
-        smtp_server = rpa_conn.get_constant("smtp_server")["value"]
-        smtp_port = rpa_conn.get_constant("smtp_port")["value"]
+    error_email = get_rpa_constant("Error Email")
+    error_sender = get_rpa_constant("Email Friend")  # Find in database...
+    smtp_server = get_rpa_constant("smtp_server")
+    smtp_port = get_rpa_constant("smtp_port")
 
     # Create message
     msg = EmailMessage()
@@ -9,22 +9,32 @@ from helpers.config import (
     DASHBOARD_STEP_5_NAME,
 )
 from helpers.context_handler import get_context_values
-from processes.application_handler import close, get_app
+from processes.application_handler import (
+    ensure_session,
+    get_app,
+    prepare_session_for_next_item,
+)
 from processes.sub_processes.clean_up import clean_up, release_keys
 from processes.sub_processes.handlers.checkpoints_handler import (
     check_clinic_data_and_consent,
     validate_contractor,
 )
 from processes.sub_processes.handlers.dashboard_data_handler import (
+    build_dashboard_item_run,
+    drain_dashboard_updates,
     update_dashboard_step_run,
     update_process_run_metadata,
 )
 from processes.sub_processes.handlers.document_handler import journalize_document
 from processes.sub_processes.handlers.journalizing_db_handler import (
+    flush_journalizing_writes,
     update_process_status,
 )
 from processes.sub_processes.handlers.journalnote_handler import create_journalnote
 from processes.sub_processes.handlers.os2forms_handler import get_os2forms_document
+from processes.sub_processes.handlers.patient_snapshot_handler import (
+    load_patient_snapshot,
+)
 from processes.sub_processes.init_set_context import set_context_vars
 
 logger = logging.getLogger(__name__)
@@ -38,6 +48,12 @@ def process_item(item_data: dict, item_reference: str, item_id: str):
         # Set context variables for further processing
         set_context_vars(item_data, item_reference, item_id)
 
+        # Resolve the item's dashboard run and step runs once for all later updates
+        build_dashboard_item_run()
+
+        # Load the patient's existing documents, notes and extern dentist in one query
+        snapshot = load_patient_snapshot()
+
         # Update process run metadata with clinic phone number and dispatch ID
         update_process_run_metadata(item_data)
 
@@ -49,7 +65,8 @@ def process_item(item_data: dict, item_reference: str, item_id: str):
         # Set journalizing process status in RPA database
         update_process_status("InProgress")
 
-        # Get the application instance
+        # Get the application instance, restarting it if the session is not healthy
+        ensure_session()
         solteq_app = get_app()
         if solteq_app is None:
             raise ValueError("Could not get application instance.")
@@ -57,8 +74,11 @@ def process_item(item_data: dict, item_reference: str, item_id: str):
         logger.info("Opening patient in Solteq Tand application...")
         solteq_app.open_patient(get_context_values("cpr"))
 
-        # Download document from OS2
-        get_os2forms_document()
+        # Download document from OS2, unless it is already journalized with its note
+        if snapshot.has_document(item_reference) and snapshot.has_journal_note():
+            logger.info("Document and journal note already exist. Skipping download.")
+        else:
+            get_os2forms_document()
 
         def journalize_form_document():
             """Journalize form document in Solteq Tand application"""
@@ -91,5 +111,13 @@ def process_item(item_data: dict, item_reference: str, item_id: str):
         update_process_status("Failed")
         raise ProcessError("A process error occurred.") from e
     finally:
-        clean_up()
-        close()
+        try:
+            # Write the buffered journalizing status and metadata in one
+            # transaction; a failure fails the item, so it is retried
+            flush_journalizing_writes()
+        finally:
+            # Deliver queued dashboard updates before the item is completed or failed
+            drain_dashboard_updates()
+            clean_up()
+            # Keep the application logged in for the next item
+            prepare_session_for_next_item()
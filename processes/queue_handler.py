@@ -1,26 +1,78 @@
 """Module to hande queue population"""
 
 import asyncio
+import itertools
 import json
 import logging
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 
+import pyodbc
 from automation_server_client import Workqueue
 
 from helpers import config
+from helpers.concurrency_limiter import AdaptiveLimiter
+from helpers.credential_constants import get_rpa_constant
 
 logger = logging.getLogger(__name__)
 
 
-def retrieve_items_for_queue() -> list[dict]:
-    """Function to populate queue"""
-    data = []
-    references = []
+def retrieve_items_for_queue() -> Iterator[dict]:
+    """
+    Yield the pending form submissions to add to the queue.
 
-    items = [
-        {"reference": ref, "data": d} for ref, d in zip(references, data, strict=True)
-    ]
+    Submissions are read in keyset-paginated chunks ordered by their key, so
+    only one chunk is held in memory at a time and the first items can be
+    queued before the rest are read. Nothing is read if
+    config.QUEUE_SOURCE_TABLE is not set.
 
-    return items
+    Yields:
+        dict: Items with a reference and data.
+    """
+    if not config.QUEUE_SOURCE_TABLE:
+        logger.warning("No queue source table is configured. No items to queue.")
+        return
+
+    key = config.QUEUE_SOURCE_KEY_COLUMN
+    select = f"""
+        SELECT TOP (?)
+            [{key}],
+            [{config.QUEUE_SOURCE_DATA_COLUMN}]
+        FROM
+            {config.QUEUE_SOURCE_TABLE}
+        WHERE
+            [{config.QUEUE_SOURCE_STATUS_COLUMN}] = ?
+    """
+    # Separate queries for the first and later chunks, so both can seek the key
+    first_query = f"{select} ORDER BY [{key}]"
+    next_query = f"{select} AND [{key}] > ? ORDER BY [{key}]"
+
+    conn = pyodbc.connect(get_rpa_constant("srvsql59_connection_string"))
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            first_query, config.QUEUE_CHUNK_SIZE, config.QUEUE_SOURCE_PENDING_STATUS
+        )
+        while True:
+            rows = cursor.fetchall()
+            for reference, data in rows:
+                yield {
+                    "reference": str(reference),
+                    "data": json.loads(data) if isinstance(data, str) else data,
+                }
+
+            if len(rows) < config.QUEUE_CHUNK_SIZE:
+                break
+            cursor.execute(
+                next_query,
+                config.QUEUE_CHUNK_SIZE,
+                config.QUEUE_SOURCE_PENDING_STATUS,
+                rows[-1][0],
+            )
+        cursor.close()
+    finally:
+        conn.close()
 
 
 def create_sort_key(item: dict) -> str:
@@ -31,69 +83,172 @@ def create_sort_key(item: dict) -> str:
     return json.dumps(item, sort_keys=True, ensure_ascii=False)
 
 
-async def concurrent_add(workqueue: Workqueue, items: list[dict]) -> None:
+def sorted_chunks(items: Iterable[dict]) -> Iterator[list[dict]]:
+    """Read items in chunks of config.QUEUE_CHUNK_SIZE, each sorted by create_sort_key."""
+    for chunk in itertools.batched(items, config.QUEUE_CHUNK_SIZE, strict=False):
+        yield sorted(chunk, key=create_sort_key)
+
+
+async def produce(
+    chunks: Iterator[list[dict]],
+    queue: asyncio.Queue[dict | None],
+    source: ThreadPoolExecutor,
+    workers: int,
+) -> None:
+    """
+    Put the items of each chunk on the queue, then one None per worker.
+
+    Chunks are read on the source executor, as reading may block on the
+    database, and the chunks are closed there when reading ends.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        while (
+            chunk := await loop.run_in_executor(source, next, chunks, None)
+        ) is not None:
+            logger.info(
+                "Processing %d items sorted by complete JSON structure", len(chunk)
+            )
+            for it in chunk:
+                await queue.put(it)
+    finally:
+        # Close the source in its own thread, e.g. if adding stopped early
+        await loop.run_in_executor(source, chunks.close)
+    for _ in range(workers):
+        await queue.put(None)
+
+
+@dataclass
+class QueueProgress:
+    """Live counts of a queue population."""
+
+    done: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    limit: int = 0
+
+    def log(self) -> None:
+        """Log the current counts."""
+        logger.info(
+            "Progress: %d done, %d failed, %d in flight (limit %d)",
+            self.done,
+            self.failed,
+            self.in_flight,
+            self.limit,
+        )
+
+
+async def concurrent_add(workqueue: Workqueue, items: Iterable[dict]) -> list[str]:
     """
     Populate the workqueue with items to be processed.
     Uses concurrency and retries with exponential backoff.
 
+    config.MAX_CONCURRENCY workers take items from a bounded asyncio.Queue and
+    add them on an executor with one thread per worker. How many adds run at
+    once is set by an AdaptiveLimiter between config.MIN_CONCURRENCY and
+    config.MAX_CONCURRENCY, from the latency and failures of the adds. Items
+    are read from the iterable in chunks of config.QUEUE_CHUNK_SIZE, sorted
+    within each chunk, only as fast as the workers take them. The iterable is
+    only ever advanced from one dedicated thread, as database connections
+    like pyodbc's must not be shared between threads. If reading it fails,
+    the workers are stopped and the error is raised.
+
     Args:
         workqueue (Workqueue): The workqueue to populate.
-        items (list[dict]): List of items to add to the queue.
+        items (Iterable[dict]): Items to add to the queue.
 
     Returns:
-        None
-
-    Raises:
-        Exception: If adding an item fails after all retries.
+        list[str]: References of the items that were added.
     """
-    sem = asyncio.Semaphore(config.MAX_CONCURRENCY)
-
-    async def add_one(it: dict):
+    loop = asyncio.get_running_loop()
+    workers = config.MAX_CONCURRENCY
+    queue: asyncio.Queue[dict | None] = asyncio.Queue(maxsize=workers * 2)
+    limiter = AdaptiveLimiter("Queue add")
+    progress = QueueProgress()
+    added: list[str] = []
+
+    async def add_one(executor: ThreadPoolExecutor, it: dict) -> bool:
         reference = str(it.get("reference") or "")
         data = {"item": it}
 
-        async with sem:
-            for attempt in range(1, config.MAX_RETRIES + 1):
-                try:
-                    await asyncio.to_thread(workqueue.add_item, data, reference)
-                    logger.info("Added item to queue with reference: %s", reference)
-                    return True
-
-                except Exception as e:
-                    if attempt >= config.MAX_RETRIES:
-                        logger.error(
-                            "Failed to add item %s after %d attempts: %s",
-                            reference,
-                            attempt,
-                            e,
-                        )
-                        return False
-
-                    backoff = config.RETRY_BASE_DELAY * (2 ** (attempt - 1))
-
-                    logger.warning(
-                        "Error adding %s (attempt %d/%d). Retrying in %.2fs... %s",
+        for attempt in range(1, config.MAX_RETRIES + 1):
+            try:
+                # Retry backoff happens outside the limiter, to free the slot
+                await limiter.run(
+                    lambda: loop.run_in_executor(
+                        executor, workqueue.add_item, data, reference
+                    )
+                )
+                logger.info("Added item to queue with reference: %s", reference)
+                return True
+
+            except Exception as e:
+                if attempt >= config.MAX_RETRIES:
+                    logger.error(
+                        "Failed to add item %s after %d attempts: %s",
                         reference,
                         attempt,
-                        config.MAX_RETRIES,
-                        backoff,
                         e,
                     )
-                    await asyncio.sleep(backoff)
-
-    if not items:
+                    return False
+
+                backoff = config.RETRY_BASE_DELAY * (2 ** (attempt - 1))
+
+                logger.warning(
+                    "Error adding %s (attempt %d/%d). Retrying in %.2fs... %s",
+                    reference,
+                    attempt,
+                    config.MAX_RETRIES,
+                    backoff,
+                    e,
+                )
+                await asyncio.sleep(backoff)
+        return False
+
+    async def worker(executor: ThreadPoolExecutor) -> None:
+        while (it := await queue.get()) is not None:
+            if await add_one(executor, it):
+                progress.done += 1
+                added.append(str(it.get("reference") or ""))
+            else:
+                progress.failed += 1
+
+    chunks = sorted_chunks(items)
+
+    async def report() -> None:
+        while True:
+            await asyncio.sleep(config.QUEUE_PROGRESS_INTERVAL)
+            progress.in_flight = limiter.in_flight
+            progress.limit = limiter.limit
+            progress.log()
+
+    with (
+        ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="queue-add"
+        ) as executor,
+        ThreadPoolExecutor(max_workers=1, thread_name_prefix="queue-source") as source,
+    ):
+        reporter = asyncio.create_task(report())
+        tasks = [asyncio.create_task(worker(executor)) for _ in range(workers)]
+        try:
+            await produce(chunks, queue, source, workers)
+            await asyncio.gather(*tasks)
+        finally:
+            # Stop the workers if the source failed, instead of leaving them waiting
+            reporter.cancel()
+            for task in tasks:
+                task.cancel()
+
+    total = progress.done + progress.failed
+    if total == 0:
         logger.info("No new items to add.")
-        return
+        return []
 
-    sorted_items = sorted(items, key=create_sort_key)
     logger.info(
-        "Processing %d items sorted by complete JSON structure", len(sorted_items)
+        "Summary: %d succeeded, %d failed out of %d",
+        progress.done,
+        progress.failed,
+        total,
     )
 
-    results = await asyncio.gather(*(add_one(i) for i in sorted_items))
-    successes = sum(1 for r in results if r)
-    failures = len(results) - successes
-
-    logger.info(
-        "Summary: %d succeeded, %d failed out of %d", successes, failures, len(results)
-    )
+    return added
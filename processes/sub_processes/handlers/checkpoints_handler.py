@@ -2,17 +2,18 @@
 
 import logging
 
-from mbu_dev_shared_components.solteqtand.database import SolteqTandDatabase
 from mbu_rpa_core.exceptions import BusinessError, ProcessError
 
 from helpers.config import DASHBOARD_STEP_6_NAME, DASHBOARD_STEP_7_NAME
 from helpers.context_handler import get_context_values
-from helpers.credential_constants import get_rpa_constant
 from processes.application_handler import get_app
 from processes.sub_processes.handlers.dashboard_data_handler import (
     check_if_clinic_data_match,
     update_dashboard_step_run,
 )
+from processes.sub_processes.handlers.patient_snapshot_handler import (
+    get_patient_snapshot,
+)
 from processes.sub_processes.handlers.solteq_contractor_handler import (
     check_if_clinic_is_in_database,
 )
@@ -81,14 +82,7 @@ def validate_contractor():
         contractor_in_database = check_if_clinic_is_in_database()
 
         # Check if contractor is set on patient in Solteq Tand
-        solteq_db_conn = get_rpa_constant("srvapptmtsql03_connection_string")
-        solteq_db_obj = SolteqTandDatabase(conn_str=solteq_db_conn)
-        filters = {
-            "p.cpr": get_context_values("cpr"),
-        }
-        current_extern_dentist_data = solteq_db_obj.get_list_of_extern_dentist(
-            filters=filters
-        )
+        current_extern_dentist_data = get_patient_snapshot().extern_dentists
         new_contractor_id = get_context_values("private_clinic_data")[0].get(
             "contractorId", []
         )
@@ -2,16 +2,23 @@
 
 import datetime
 import logging
-import os
+import threading
+import time
+from dataclasses import dataclass, field
 
 import requests
 from mbu_rpa_core.exceptions import BusinessError
 
-from helpers import config
-from helpers.context_handler import get_context_values
+from helpers import ats_functions, config
+from helpers.context_handler import get_context_values, set_context_values
+from helpers.dashboard_client import DashboardClient, get_dashboard_client
+from helpers.dashboard_dispatcher import StepRunDispatcher, StepRunUpdate
+from helpers.exception_catalog import classify_error
 
 logger = logging.getLogger(__name__)
 
+HTTP_STATUS_NOT_FOUND = 404
+
 
 def get_dashboard_process_data() -> dict:
     """
@@ -31,17 +38,12 @@ def get_dashboard_process_data() -> dict:
         if not cpr:
             raise ValueError("CPR number not found in context values.")
 
-        base_endpoint = os.environ.get("DASHBOARD_API_URL")
-        if not base_endpoint:
-            raise ValueError("DASHBOARD_API_URL environment variable not set.")
-
-        url = f"{base_endpoint}/runs/?process_id=1&meta_filter=cpr:{cpr}&order_by=created_at&sort_direction=desc"
-
-        api_key = os.environ.get("API_ADMIN_TOKEN")
-        if not api_key:
-            raise ValueError("API_ADMIN_TOKEN environment variable not set.")
-
-        response = requests.get(url=url, headers={"x-api-key": api_key}, timeout=30)
+        client: DashboardClient = get_context_values("dashboard_client")
+        process_id = get_dashboard_process_id(config.DASHBOARD_PROCESS_NAME, client)
+        response = client.get(
+            f"/runs/?process_id={process_id}&meta_filter=cpr:{cpr}"
+            "&order_by=created_at&sort_direction=desc"
+        )
         response.raise_for_status()
         return response.json()
     except requests.RequestException as e:
@@ -52,113 +54,445 @@ def get_dashboard_process_data() -> dict:
         raise RuntimeError(f"An unexpected error occurred: {ex}") from ex
 
 
-def get_dashboard_process_id(process_name: str, api_context: dict) -> dict:
+class DashboardMetadataResolver:
+    """
+    Run-scoped name -> ID index for dashboard processes and their steps.
+
+    The process list and the steps of a process are each downloaded once and
+    reused until the TTL expires, or until the index is invalidated because
+    the API no longer recognises one of the cached IDs.
+    """
+
+    def __init__(self, ttl: float = config.DASHBOARD_METADATA_TTL) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._process_ids: dict[str, int] = {}
+        self._step_ids: dict[int, dict[str, int]] = {}
+        self._loaded_at: float | None = None
+
+    def invalidate(self) -> None:
+        """Drop all cached IDs so the next lookup reloads them."""
+        with self._lock:
+            logger.info("Invalidating dashboard metadata cache.")
+            self._process_ids = {}
+            self._step_ids = {}
+            self._loaded_at = None
+
+    def get_process_id(self, process_name: str, client: DashboardClient) -> int:
+        """Return the ID of the named process, loading the process list if needed."""
+        with self._lock:
+            self._expire_if_stale()
+            if not self._process_ids:
+                self._load_processes(client)
+
+            if process_name not in self._process_ids:
+                raise ValueError(f"Dashboard process '{process_name}' not found.")
+            return self._process_ids[process_name]
+
+    def get_step_id(
+        self, process_id: int, step_name: str, client: DashboardClient
+    ) -> int:
+        """Return the ID of the named step, loading all steps of the process if needed."""
+        with self._lock:
+            self._expire_if_stale()
+            if process_id not in self._step_ids:
+                self._load_steps(process_id, client)
+
+            steps = self._step_ids[process_id]
+            if step_name not in steps:
+                raise ValueError(
+                    f"Dashboard step '{step_name}' not found for process {process_id}."
+                )
+            return steps[step_name]
+
+    def _expire_if_stale(self) -> None:
+        if (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at > self.ttl
+        ):
+            logger.info("Dashboard metadata cache expired.")
+            self._process_ids = {}
+            self._step_ids = {}
+            self._loaded_at = None
+
+    def _load_processes(self, client: DashboardClient) -> None:
+        logger.info("Loading dashboard processes.")
+        response = client.get("/processes/?include_deleted=false")
+        response.raise_for_status()
+        self._process_ids = {p["name"]: p["id"] for p in response.json()["items"]}
+        self._loaded_at = self._loaded_at or time.monotonic()
+
+    def _load_steps(self, process_id: int, client: DashboardClient) -> None:
+        logger.info("Loading dashboard steps for process ID: %s", process_id)
+        response = client.get(f"/steps/process/{process_id}?include_deleted=false")
+        response.raise_for_status()
+        self._step_ids[process_id] = {s["name"]: s["id"] for s in response.json()}
+        self._loaded_at = self._loaded_at or time.monotonic()
+
+
+_METADATA_RESOLVER = DashboardMetadataResolver()
+
+
+def get_metadata_resolver() -> DashboardMetadataResolver:
+    """Get the run-scoped dashboard metadata resolver."""
+    return _METADATA_RESOLVER
+
+
+def _is_not_found(error: requests.HTTPError) -> bool:
+    """Check if an HTTP error is a 404 response."""
+    return (
+        error.response is not None
+        and error.response.status_code == HTTP_STATUS_NOT_FOUND
+    )
+
+
+def get_dashboard_process_id(process_name: str, client: DashboardClient) -> int:
     """Retrieve the process ID for a given process name."""
     logger.info("Retrieving process ID for process name: %s", process_name)
     try:
-        endpoint = api_context["endpoint"]
-        headers = api_context["headers"]
-
-        processes = requests.get(
-            f"{endpoint}/processes/?include_deleted=false",
-            headers=headers,
-            timeout=30,
-        ).json()
-        process = next(p for p in processes["items"] if p["name"] == process_name)
-        process_id = process["id"]
-
-        return process_id
+        return get_metadata_resolver().get_process_id(process_name, client)
     except Exception as e:
         logger.error("Error retrieving process ID: %s", e)
         raise
 
 
 def get_dashboard_step_run_id(
-    process_id: int, step_name: str, api_context: dict
-) -> dict:
+    process_id: int, step_name: str, client: DashboardClient
+) -> int:
     """Retrieve the step ID for a given process ID and step name."""
     logger.info("Retrieving step ID for step name: %s", step_name)
     try:
-        endpoint = api_context["endpoint"]
-        headers = api_context["headers"]
-
-        steps = requests.get(
-            f"{endpoint}/steps/process/{process_id}?include_deleted=false",
-            headers=headers,
-            timeout=30,
-        ).json()
-        step = next(s for s in steps if s["name"] == step_name)
-        step_id = step["id"]
-        return step_id
+        return get_metadata_resolver().get_step_id(process_id, step_name, client)
     except Exception as e:
         logger.error("Error retrieving step ID: %s", e)
         raise
 
 
-def get_dashboard_run_id(process_id: int, cpr: str, api_context: dict) -> dict:
-    """Retrieve the latest run ID for a given process ID and CPR number."""
+def _parse_timestamp(value: object) -> datetime.datetime | None:
+    """Parse an ISO timestamp from the APIs, taken as UTC if it has no zone."""
+    try:
+        timestamp = datetime.datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=datetime.UTC)
+    return timestamp
+
+
+class DashboardRunCache:
+    """
+    Run-scoped CPR -> run index for the dashboard process.
+
+    Filled up front with the runs of the queued CPR numbers, so item lookups
+    are answered from memory. Lookups that miss, or whose run was cached more
+    than config.DASHBOARD_RUN_CACHE_TTL ago, fall back to the API and the
+    result is added to the index.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._runs: dict[str, tuple[dict, float]] = {}
+
+    def load(
+        self,
+        process_id: int,
+        client: DashboardClient,
+        cprs: set[str],
+        created_after: datetime.datetime | None = None,
+    ) -> int:
+        """
+        Page through the runs of a process, newest first, and index the latest
+        run of each of the CPR numbers.
+
+        Paging stops when all the CPR numbers have a run, or when the runs are
+        older than created_after.
+
+        Returns:
+            int: Number of CPRs in the index.
+        """
+        page_size = config.DASHBOARD_RUNS_PAGE_SIZE
+        runs: dict[str, dict] = {}
+        page = 1
+        while True:
+            response = client.get(
+                f"/runs/?process_id={process_id}&order_by=created_at"
+                f"&sort_direction=desc&page={page}&size={page_size}"
+            )
+            response.raise_for_status()
+            data = response.json()
+            items = data.get("items", [])
+
+            for run in items:
+                cpr = str((run.get("meta") or {}).get("cpr") or "")
+                if cpr in cprs:
+                    # Runs come newest first, so keep the first run seen per CPR
+                    runs.setdefault(cpr, run)
+
+            if len(runs) == len(cprs):
+                break
+            if created_after is not None and items:
+                oldest = _parse_timestamp(items[-1].get("created_at"))
+                if oldest is not None and oldest < created_after:
+                    break
+            if len(items) < page_size or page >= data.get("pages", page + 1):
+                break
+            page += 1
+
+        loaded_at = time.monotonic()
+        with self._lock:
+            self._runs = {cpr: (run, loaded_at) for cpr, run in runs.items()}
+        return len(runs)
+
+    def get(self, cpr: str) -> dict | None:
+        """Get the cached run for a CPR, if any and not expired."""
+        with self._lock:
+            cached = self._runs.get(str(cpr))
+        if cached is None:
+            return None
+        run, loaded_at = cached
+        if time.monotonic() - loaded_at > config.DASHBOARD_RUN_CACHE_TTL:
+            return None
+        return run
+
+    def put(self, cpr: str, run: dict) -> None:
+        """Add or replace the cached run for a CPR."""
+        with self._lock:
+            self._runs[str(cpr)] = (run, time.monotonic())
+
+
+_RUN_CACHE = DashboardRunCache()
+
+
+def get_run_cache() -> DashboardRunCache:
+    """Get the run-scoped CPR -> dashboard run index."""
+    return _RUN_CACHE
+
+
+def prefetch_dashboard_runs(pending_items: dict[str, dict]) -> None:
+    """
+    Load the runs of the queued CPR numbers into the run cache.
+
+    Runs are read back to config.DASHBOARD_RUNS_LOOKBACK_DAYS before the
+    oldest queued item. Failing to prefetch is not fatal, as item lookups then
+    fall back to the API.
+
+    Args:
+        pending_items (dict[str, dict]): Workqueue rows of the pending items
+            by reference.
+    """
+    cprs = set()
+    created = []
+    for row in pending_items.values():
+        cpr = ats_functions.get_row_item_data(row).get("cpr")
+        if cpr:
+            cprs.add(str(cpr))
+        if (created_at := _parse_timestamp(row.get("created_at"))) is not None:
+            created.append(created_at)
+
+    if not cprs:
+        logger.info("No queued items to prefetch dashboard runs for.")
+        return
+
+    created_after = None
+    if created:
+        created_after = min(created) - datetime.timedelta(
+            days=config.DASHBOARD_RUNS_LOOKBACK_DAYS
+        )
+
+    logger.info("Prefetching dashboard runs for %d CPR numbers...", len(cprs))
     try:
-        endpoint = api_context["endpoint"]
-        headers = api_context["headers"]
+        client = get_dashboard_client()
+        process_id = get_dashboard_process_id(config.DASHBOARD_PROCESS_NAME, client)
+        count = get_run_cache().load(
+            process_id=process_id,
+            client=client,
+            cprs=cprs,
+            created_after=created_after,
+        )
+        logger.info("Prefetched dashboard runs for %d CPR numbers.", count)
+    except Exception as e:
+        logger.warning("Could not prefetch dashboard runs: %s", e)
+
 
-        runs_url = f"{endpoint}/runs/?process_id={process_id}&meta_filter=cpr:{cpr}"
-        runs = requests.get(runs_url, headers=headers, timeout=30).json()
-        run_id = runs["items"][0]["id"]
-        return run_id
+def get_dashboard_run(process_id: int, cpr: str, client: DashboardClient) -> dict:
+    """Retrieve the latest run for a given process ID and CPR number."""
+    run = get_run_cache().get(cpr)
+    if run is not None:
+        return run
+
+    try:
+        runs = client.get(
+            f"/runs/?process_id={process_id}&meta_filter=cpr:{cpr}"
+            "&order_by=created_at&sort_direction=desc"
+        ).json()
+        run = runs["items"][0]
+        get_run_cache().put(cpr, run)
+        return run
     except Exception as e:
-        logger.error("Error retrieving run ID: %s", e)
+        logger.error("Error retrieving run: %s", e)
         raise
 
 
+def get_dashboard_run_id(process_id: int, cpr: str, client: DashboardClient) -> int:
+    """Retrieve the latest run ID for a given process ID and CPR number."""
+    return get_dashboard_run(process_id, cpr, client)["id"]
+
+
 def get_dashboard_step_run_details(
-    run_id: int, step_id: int, api_context: dict
+    run_id: int, step_id: int, client: DashboardClient
 ) -> dict:
     """Retrieve the step run details for a given run ID and step ID."""
     # 4. Get the step run by run_id and step_id
     try:
-        endpoint = api_context["endpoint"]
-        headers = api_context["headers"]
-
-        step_run = requests.get(
-            f"{endpoint}/step-runs/run/{run_id}/step/{step_id}?include_deleted=false",
-            headers=headers,
-            timeout=30,
-        ).json()
-        return step_run
+        response = client.get(
+            f"/step-runs/run/{run_id}/step/{step_id}?include_deleted=false"
+        )
+        response.raise_for_status()
+        return response.json()
     except Exception as e:
         logger.error("Error retrieving step run details: %s", e)
         raise
 
 
+def _get_step_run_id(
+    process_id: int, run_id: int, step_name: str, client: DashboardClient
+) -> int:
+    """Retrieve the step run ID for a step of an already resolved run."""
+    step_id = get_dashboard_step_run_id(process_id, step_name, client)
+    try:
+        step_run_details = get_dashboard_step_run_details(run_id, step_id, client)
+    except requests.HTTPError as e:
+        if not _is_not_found(e):
+            raise
+        # A 404 means the cached step ID is stale, so reload and retry once
+        logger.warning("Step run not found for step '%s'. Retrying.", step_name)
+        get_metadata_resolver().invalidate()
+        step_id = get_dashboard_step_run_id(process_id, step_name, client)
+        step_run_details = get_dashboard_step_run_details(run_id, step_id, client)
+
+    step_run_id = step_run_details.get("id")
+    if step_run_id is None:
+        raise RuntimeError("Step run ID not found in step run details.")
+    return step_run_id
+
+
 def get_step_run_id_for_process_step_cpr(
-    process_name: str, step_name: str, cpr: str, api_context: dict
+    process_name: str, step_name: str, cpr: str, client: DashboardClient
 ) -> int:
     """
     Retrieves the step run ID for the given process name, step name, and CPR number.
     """
-    process_id = get_dashboard_process_id(process_name, api_context)
-    step_id = get_dashboard_step_run_id(process_id, step_name, api_context)
-    run_id = get_dashboard_run_id(process_id, cpr, api_context)
-    step_run_details = get_dashboard_step_run_details(run_id, step_id, api_context)
-    step_run_id = step_run_details.get("id")
+    process_id = get_dashboard_process_id(process_name, client)
+    run_id = get_dashboard_run_id(process_id, cpr, client)
+    return _get_step_run_id(process_id, run_id, step_name, client)
+
+
+@dataclass
+class DashboardItemRun:
+    """
+    Snapshot of the current item's dashboard run: its ID, its step run IDs by
+    step name and its meta, kept in step with the meta we write ourselves.
+    """
+
+    run_id: int
+    step_run_ids: dict[str, int] = field(default_factory=dict)
+    meta: dict = field(default_factory=dict)
+
+
+def build_dashboard_item_run() -> DashboardItemRun:
+    """
+    Resolve the run of the current item and the step runs of all configured
+    steps in one pass, and store the result in the context.
+
+    Returns:
+        DashboardItemRun: The resolved run and step run IDs.
+    """
+    client: DashboardClient = get_context_values("dashboard_client")
+    process_id = get_dashboard_process_id(config.DASHBOARD_PROCESS_NAME, client)
+    run = get_dashboard_run(
+        process_id=process_id,
+        cpr=get_context_values("cpr"),
+        client=client,
+    )
+    run_id = run.get("id")
+    if not run_id:
+        logger.error("Process run ID not found")
+        raise RuntimeError("Process run ID not found.")
+
+    item_run = DashboardItemRun(run_id=run_id, meta=dict(run.get("meta") or {}))
+    for step_name in config.DASHBOARD_STEP_NAMES:
+        item_run.step_run_ids[step_name] = _get_step_run_id(
+            process_id, run_id, step_name, client
+        )
+    logger.info("Resolved dashboard run for item: %s", item_run)
+
+    set_context_values(dashboard_item_run=item_run)
+    return item_run
+
+
+def get_dashboard_item_run() -> DashboardItemRun:
+    """Get the dashboard run of the current item, resolving it if needed."""
+    item_run = get_context_values("dashboard_item_run")
+    if item_run is None:
+        item_run = build_dashboard_item_run()
+    return item_run
+
+
+def refresh_dashboard_item_run() -> DashboardItemRun:
+    """
+    Re-read the current item's run from the dashboard API and update the
+    snapshot in place. Use this only when a fresh read is really required.
+
+    Returns:
+        DashboardItemRun: The refreshed snapshot.
+    """
+    item_run = get_dashboard_item_run()
+    runs = get_dashboard_process_data().get("items", [])
+    if not runs:
+        raise RuntimeError("Process run not found.")
+
+    latest_run = runs[0]
+    if latest_run["id"] != item_run.run_id:
+        # The step runs belong to the run, so resolve those of the new one
+        logger.info(
+            "Dashboard run changed from %s to %s. Resolving its step runs.",
+            item_run.run_id,
+            latest_run["id"],
+        )
+        client: DashboardClient = get_context_values("dashboard_client")
+        process_id = get_dashboard_process_id(config.DASHBOARD_PROCESS_NAME, client)
+        item_run.step_run_ids = {
+            step_name: _get_step_run_id(process_id, latest_run["id"], step_name, client)
+            for step_name in config.DASHBOARD_STEP_NAMES
+        }
+    item_run.run_id = latest_run["id"]
+    item_run.meta = dict(latest_run.get("meta") or {})
+    get_run_cache().put(get_context_values("cpr"), latest_run)
+    logger.info("Refreshed dashboard run for item: %s", item_run)
+    return item_run
+
+
+def get_item_step_run_id(step_name: str) -> int:
+    """Get the step run ID of the current item for a given step name."""
+    item_run = get_dashboard_item_run()
+    step_run_id = item_run.step_run_ids.get(step_name)
     if step_run_id is None:
-        raise RuntimeError("Step run ID not found in step run details.")
+        client: DashboardClient = get_context_values("dashboard_client")
+        process_id = get_dashboard_process_id(config.DASHBOARD_PROCESS_NAME, client)
+        step_run_id = _get_step_run_id(process_id, item_run.run_id, step_name, client)
+        item_run.step_run_ids[step_name] = step_run_id
     return step_run_id
 
 
 def update_dashboard_step_run_by_id(
-    step_run_id: int, update_data: dict, api_context: dict
+    step_run_id: int, update_data: dict, client: DashboardClient
 ) -> tuple[dict, int]:
     """Update the step run details for a given step run ID."""
     try:
-        endpoint = api_context["endpoint"]
-        headers = api_context["headers"]
-
-        response = requests.patch(
-            f"{endpoint}/step-runs/{step_run_id}",
-            headers={**headers, "Accept-Charset": "utf-8"},
+        response = client.patch(
+            f"/step-runs/{step_run_id}",
+            headers={"Accept-Charset": "utf-8"},
             json=update_data,
-            timeout=30,
         )
         response.raise_for_status()
         return response.json(), response.status_code
@@ -181,9 +515,11 @@ def build_step_run_update(
     failure_data = None
     if failure:
         if isinstance(failure, BusinessError):
-            # For BusinessError, use the exception details as-is
+            # For BusinessError, use the exception details as-is, with the
+            # catalog code when the message is a known business exception
+            entry = classify_error(failure)
             failure_data = {
-                "error_code": type(failure).__name__,
+                "error_code": entry.code if entry else type(failure).__name__,
                 "message": str(failure),
                 "details": str(failure.__traceback__)
                 if failure.__traceback__
@@ -221,38 +557,70 @@ def update_dashboard_step_run(
 ) -> None:
     """Update dashboard step run status for a given step name and status."""
     logger.info("Updating dashboard step run: %s to status: %s", step_name, status)
-    step_run_id = get_step_run_id_for_process_step_cpr(
-        process_name=config.DASHBOARD_PROCESS_NAME,
-        step_name=step_name,
-        cpr=get_context_values("cpr"),
-        api_context=get_context_values("api_context"),
-    )
+    step_run_id = get_item_step_run_id(step_name)
     logger.info("Step run ID for step '%s': %s", step_name, step_run_id)
     update_data = build_step_run_update(status=status, failure=failure, rerun=rerun)
     logger.info("Update data prepared: %s", update_data)
+    get_step_run_dispatcher().submit(
+        StepRunUpdate(
+            step_run_id=step_run_id, step_name=step_name, update_data=update_data
+        )
+    )
+    logger.info("Dashboard step run update queued for step '%s'", step_name)
+
+
+def _send_step_run_update(update: StepRunUpdate) -> None:
+    """Deliver a queued step run update. Runs on the dispatcher thread."""
     update_dashboard_step_run_by_id(
-        step_run_id=step_run_id,
-        update_data=update_data,
-        api_context=get_context_values("api_context"),
+        step_run_id=update.step_run_id,
+        update_data=update.update_data,
+        client=get_dashboard_client(),
     )
-    logger.info("Dashboard step run updated for step '%s'", step_name)
+    logger.info("Dashboard step run updated for step '%s'", update.step_name)
+
+
+_DISPATCHER = StepRunDispatcher(
+    send=_send_step_run_update, window=config.DASHBOARD_COALESCE_WINDOW
+)
+
+
+def get_step_run_dispatcher() -> StepRunDispatcher:
+    """Get the dispatcher that delivers step run updates in the background."""
+    return _DISPATCHER
 
 
-def check_if_clinic_data_match() -> bool:
+def drain_dashboard_updates() -> None:
+    """Wait for queued step run updates and report any that were not delivered."""
+    dispatcher = get_step_run_dispatcher()
+    undelivered = dispatcher.drain(timeout=config.DASHBOARD_DRAIN_TIMEOUT)
+    logger.info(
+        "Dashboard updates drained. Coalesced so far: %d, duplicates dropped: %d",
+        dispatcher.coalesced,
+        dispatcher.duplicates_dropped,
+    )
+    for update in undelivered:
+        logger.error(
+            "Dashboard update for step '%s' (step run %s) was not delivered: %s",
+            update.step_name,
+            update.step_run_id,
+            update.update_data,
+        )
+
+
+def check_if_clinic_data_match(refresh: bool = False) -> bool:
     """
     Checks if the clinic data from the dashboard matches the context values.
 
+    Args:
+        refresh (bool): Re-read the run from the dashboard API instead of
+            using the item's run snapshot.
+
     Returns:
         bool: True if clinic data matches, False otherwise.
     """
     try:
-        dashboard_data = get_dashboard_process_data()
-        runs = dashboard_data.get("items", [])
-        if not runs:
-            return False
-
-        latest_run = runs[0]
-        meta = latest_run.get("meta", {})
+        item_run = refresh_dashboard_item_run() if refresh else get_dashboard_item_run()
+        meta = item_run.meta
 
         # Extract clinic data from dashboard meta
         dashboard_clinic_phone = (
@@ -293,31 +661,14 @@ def update_process_run_metadata(item_data: dict) -> dict:
 
     logger.info("Updating process run metadata: %s", process_run_metadata)
 
-    api_context = get_context_values("api_context")
-    endpoint = api_context["endpoint"]
-    headers = api_context["headers"]
+    client: DashboardClient = get_context_values("dashboard_client")
     HTTP_STATUS_OK = 200
 
-    process_id = get_dashboard_process_id(config.DASHBOARD_PROCESS_NAME, api_context)
-    if not process_id:
-        logger.error("Process ID not found for process name")
-        raise RuntimeError("Process ID not found for process name.")
+    item_run = get_dashboard_item_run()
 
-    process_run_id = get_dashboard_run_id(
-        process_id=process_id,
-        cpr=get_context_values("cpr"),
-        api_context=get_context_values("api_context"),
-    )
-
-    if not process_run_id:
-        logger.error("Process run ID not found")
-        raise RuntimeError("Process run ID not found.")
-
-    response = requests.patch(
-        url=(f"{endpoint}/runs/{process_run_id}/metadata"),
+    response = client.patch(
+        f"/runs/{item_run.run_id}/metadata",
         json={"meta": process_run_metadata},
-        headers=headers,
-        timeout=10,
     )
 
     if response.status_code != HTTP_STATUS_OK:
@@ -328,4 +679,7 @@ def update_process_run_metadata(item_data: dict) -> dict:
         )
         raise RuntimeError("Failed to update process run metadata.")
 
+    # Keep the run snapshot in step with what we just wrote
+    item_run.meta.update(process_run_metadata)
+
     return response.json()
@@ -2,11 +2,11 @@
 
 import logging
 
-from mbu_dev_shared_components.solteqtand.database import SolteqTandDatabase
-
 from helpers import config
 from helpers.context_handler import get_context_values
 from helpers.credential_constants import get_rpa_constant
+from helpers.solteq_database import get_solteq_database
+from helpers.verification_poller import poll_until
 from processes.application_handler import get_app
 from processes.sub_processes.handlers.dashboard_data_handler import (
     update_dashboard_step_run,
@@ -15,6 +15,10 @@ from processes.sub_processes.handlers.journalizing_db_handler import (
     update_process_status,
     update_response_metadata,
 )
+from processes.sub_processes.handlers.patient_snapshot_handler import (
+    document_filters,
+    get_patient_snapshot,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -29,38 +33,32 @@ def journalize_document():
         if solteq_app is None:
             raise ValueError("Could not get application instance.")
 
-        solteq_db_conn = get_rpa_constant("srvapptmtsql03_connection_string")
         document_type = config.DOCUMENT_TYPE
         full_path = get_context_values("os2forms_document_path")
         item_reference = get_context_values("reference")
-
-        # Create RPA database object
-        solteq_db_obj = SolteqTandDatabase(conn_str=solteq_db_conn)
+        snapshot = get_patient_snapshot()
 
         # Check if document already exists else journalize it
-        filters = {
-            "p.cpr": get_context_values("cpr"),
-            "ds.OriginalFilename": config.DOCUMENT_FILE_NAME,
-            "ds.DocumentType": document_type,
-            "ds.DocumentDescription": f"%{item_reference}%",
-            "ds.rn": "1",
-            "ds.DocumentStoreStatusId": "1",
-        }
-        document_exists = solteq_db_obj.get_list_of_documents(filters=filters)
-
-        if not document_exists:
+        if not snapshot.has_document(item_reference):
             solteq_app.create_document(
                 document_full_path=full_path,
                 document_type=document_type,
                 document_description=item_reference,
             )
 
-            check_document_journalized = solteq_db_obj.get_list_of_documents(
-                filters=filters
+            # Wait for the document to show up in the database
+            solteq_db_obj = get_solteq_database(
+                get_rpa_constant("srvapptmtsql03_connection_string")
             )
-
-            if not check_document_journalized:
-                raise RuntimeError("Document journalizing failed.")
+            filters = document_filters(snapshot.cpr, item_reference)
+            try:
+                documents = poll_until(
+                    lambda: solteq_db_obj.get_list_of_documents(filters=filters),
+                    description="Journalized document",
+                )
+            except TimeoutError as e:
+                raise RuntimeError("Document journalizing failed.") from e
+            snapshot.documents.extend(documents)
 
         # Update journalizing response metadata in RPA database
         update_response_metadata(
@@ -2,7 +2,9 @@
 
 import json
 import logging
+import threading
 
+import pyodbc
 from mbu_dev_shared_components.utils.db_stored_procedure_executor import (
     execute_stored_procedure,
 )
@@ -12,24 +14,248 @@ from helpers.credential_constants import get_rpa_constant
 
 logger = logging.getLogger(__name__)
 
+STATUS_PROCEDURE = "journalizing.sp_update_status"
+RESPONSE_PROCEDURE = "journalizing.sp_update_response"
+
+# Statuses each status may move to. Finished items do not move back.
+STATUS_TRANSITIONS = {
+    "InProgress": {"Successful", "Failed"},
+    "Successful": set(),
+    "Failed": set(),
+}
+
+
+class ProcessStatusTracker:
+    """
+    Run-scoped record of the last status persisted per reference.
+
+    Decides whether a status write is needed: writes repeating the current
+    status are skipped, and writes moving a finished item back are rejected.
+    Statuses only count as written once they are persisted, so writes lost
+    to a failed flush are made again on a retry.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._persisted: dict[str, str] = {}
+        self.written = 0
+        self.skipped = 0
+        self.rejected = 0
+
+    def get_persisted(self, reference: str) -> str | None:
+        """Get the last status persisted for a reference in this run."""
+        with self._lock:
+            return self._persisted.get(str(reference))
+
+    def mark_persisted(self, reference: str, status: str, written: int = 1) -> None:
+        """
+        Record that statuses have been written for a reference.
+
+        Args:
+            reference (str): Reference of the item.
+            status (str): The last status written.
+            written (int): Number of status writes persisted.
+        """
+        with self._lock:
+            self._persisted[str(reference)] = status
+            self.written += written
+
+    def should_write(self, reference: str, status: str, current: str | None) -> bool:
+        """
+        Check if a status write is needed and count the outcome.
+
+        Args:
+            reference (str): Reference of the item.
+            status (str): Status to write.
+            current (str | None): The item's current status, e.g. one that is
+                queued but not yet written. Falls back to the persisted status.
+
+        Returns:
+            bool: True if the status should be written.
+        """
+        current = current or self.get_persisted(reference)
+        with self._lock:
+            if status == current:
+                logger.info("Status for %s is already %s. Skipping.", reference, status)
+                self.skipped += 1
+                return False
+            if (
+                current in STATUS_TRANSITIONS
+                and status not in STATUS_TRANSITIONS[current]
+            ):
+                logger.warning(
+                    "Rejecting status change for %s from %s to %s.",
+                    reference,
+                    current,
+                    status,
+                )
+                self.rejected += 1
+                return False
+            return True
+
+
+_STATUS_TRACKER = ProcessStatusTracker()
+
+
+def get_status_tracker() -> ProcessStatusTracker:
+    """Get the run-scoped process status tracker."""
+    return _STATUS_TRACKER
+
+
+class JournalizingWriteBuffer:
+    """
+    Collects an item's status and response metadata writes, so they can be
+    written to the RPA database in one transaction.
+
+    Writes are kept in the order they were made. Fragments for the same step
+    are merged into the first write of that step.
+    """
+
+    def __init__(self, reference: str) -> None:
+        self.reference = reference
+        self._writes: list[tuple[str, str]] = []
+        self._fragments: dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._writes)
+
+    @property
+    def statuses(self) -> list[str]:
+        """The queued statuses, in order."""
+        return [value for kind, value in self._writes if kind == STATUS_PROCEDURE]
+
+    @property
+    def last_status(self) -> str | None:
+        """The last queued status, if any."""
+        statuses = self.statuses
+        return statuses[-1] if statuses else None
+
+    def add_status(self, status: str) -> None:
+        """Queue a process status write."""
+        self._writes.append((STATUS_PROCEDURE, status))
+
+    def add_fragment(self, step_name: str, json_fragment: dict) -> None:
+        """Queue a response metadata write, merged with earlier ones for the step."""
+        if step_name not in self._fragments:
+            self._fragments[step_name] = {}
+            self._writes.append((RESPONSE_PROCEDURE, step_name))
+        self._fragments[step_name].update(json_fragment)
+
+    def build_batch(self) -> tuple[str, list]:
+        """Build one SQL batch executing all queued writes, with its parameters."""
+        statements = ["SET NOCOUNT ON;"]
+        params: list = []
+        for procedure, value in self._writes:
+            if procedure == STATUS_PROCEDURE:
+                statements.append(f"EXEC {procedure} @Status = ?, @form_id = ?;")
+                params.extend([value, f"{self.reference}"])
+            else:
+                statements.append(
+                    f"EXEC {procedure} @StepName = ?, @JsonFragment = ?, @form_id = ?;"
+                )
+                params.extend(
+                    [value, json.dumps(self._fragments[value]), self.reference]
+                )
+        return "\n".join(statements), params
+
+    def flush(self, connection_string: str) -> None:
+        """Write all queued writes in one transaction and clear the buffer."""
+        if not self._writes:
+            return
+
+        batch, params = self.build_batch()
+        conn = pyodbc.connect(connection_string)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(batch, params)
+            # Later statements of the batch only run as their results are read
+            while cursor.nextset():
+                pass
+            conn.commit()
+            cursor.close()
+        except pyodbc.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        logger.info("Flushed %d journalizing writes.", len(self._writes))
+        if statuses := self.statuses:
+            get_status_tracker().mark_persisted(
+                self.reference, statuses[-1], written=len(statuses)
+            )
+        self._writes.clear()
+        self._fragments.clear()
+
+
+def _get_write_buffer() -> JournalizingWriteBuffer | None:
+    """Get the current item's write buffer, if writes are being buffered."""
+    return get_context_values("journalizing_writes")
+
+
+def flush_journalizing_writes():
+    """
+    Write the current item's buffered status and response metadata to the
+    RPA database. Called when the item ends, whether it succeeded or failed.
+
+    Raises:
+        RuntimeError: If the writes could not be flushed. None of them are
+            persisted then, so the item must not be completed.
+    """
+    buffer = _get_write_buffer()
+    if buffer is None or not buffer:
+        return
+
+    tracker = get_status_tracker()
+    try:
+        buffer.flush(get_rpa_constant("srvsql59_connection_string"))
+    except Exception as e:
+        logger.error(
+            "Error flushing %d journalizing writes for %s: %s",
+            len(buffer),
+            buffer.reference,
+            e,
+        )
+        raise RuntimeError("Error flushing journalizing writes: " + str(e)) from e
+    finally:
+        logger.info(
+            "Status writes so far: %d written, %d skipped, %d rejected.",
+            tracker.written,
+            tracker.skipped,
+            tracker.rejected,
+        )
+
 
 def update_process_status(status: str):
     """Function to update journalizing process status in RPA database"""
     try:
+        reference = get_context_values("reference")
+        buffer = _get_write_buffer()
+        tracker = get_status_tracker()
+        current = buffer.last_status if buffer is not None else None
+        if not tracker.should_write(reference, status, current):
+            return
+
+        if buffer is not None:
+            logger.info("Queueing process status: %s", status)
+            buffer.add_status(status)
+            return
+
         logger.info("Updating process status to: %s", status)
 
         rpa_db_conn = get_rpa_constant("srvsql59_connection_string")
-        reference = get_context_values("reference")
 
         status_params = {
             "Status": ("str", status),
             "form_id": ("str", f"{reference}"),
         }
-        execute_stored_procedure(
+        result = execute_stored_procedure(
             connection_string=rpa_db_conn,
-            stored_procedure="journalizing.sp_update_status",
+            stored_procedure=STATUS_PROCEDURE,
             params=status_params,
         )
+        if result.get("success"):
+            tracker.mark_persisted(reference, status)
 
         logger.info("Process status updated successfully.")
     except Exception as e:
@@ -40,6 +266,12 @@ def update_process_status(status: str):
 def update_response_metadata(step_name: str, json_fragment: dict):
     """Function to update journalizing response metadata in RPA database"""
     try:
+        buffer = _get_write_buffer()
+        if buffer is not None:
+            logger.info("Queueing response metadata for step: %s", step_name)
+            buffer.add_fragment(step_name, json_fragment)
+            return
+
         logger.info("Updating response metadata for step: %s", step_name)
 
         rpa_db_conn = get_rpa_constant("srvsql59_connection_string")
@@ -52,7 +284,7 @@ def update_response_metadata(step_name: str, json_fragment: dict):
         }
         execute_stored_procedure(
             connection_string=rpa_db_conn,
-            stored_procedure="journalizing.sp_update_response",
+            stored_procedure=RESPONSE_PROCEDURE,
             params=sql_data_params,
         )
 
@@ -1,13 +1,11 @@
 """Module to handle journal note creation in SolteqTand"""
 
 import logging
-import time
-
-from mbu_dev_shared_components.solteqtand.database import SolteqTandDatabase
 
 from helpers import config
-from helpers.context_handler import get_context_values
 from helpers.credential_constants import get_rpa_constant
+from helpers.solteq_database import get_solteq_database
+from helpers.verification_poller import poll_until
 from processes.application_handler import get_app
 from processes.sub_processes.handlers.dashboard_data_handler import (
     update_dashboard_step_run,
@@ -16,6 +14,10 @@ from processes.sub_processes.handlers.journalizing_db_handler import (
     update_process_status,
     update_response_metadata,
 )
+from processes.sub_processes.handlers.patient_snapshot_handler import (
+    get_patient_snapshot,
+    journal_note_filters,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -31,32 +33,26 @@ def create_journalnote():
             raise ValueError("Could not get application instance.")
 
         # Check if journal note already exists else create it
-        solteq_db_conn = get_rpa_constant("srvapptmtsql03_connection_string")
-        solteq_db_obj = SolteqTandDatabase(conn_str=solteq_db_conn)
-        journal_note_message_sql_lookup = config.JOURNAL_NOTE_DOCUMENT_MESSAGE.replace(
-            "Administrativt notat ", ""
-        ).replace("'", "")
-
-        filters = {
-            "p.cpr": get_context_values("cpr"),
-            "dn.Beskrivelse": journal_note_message_sql_lookup,
-        }
-
-        journal_note_exists = solteq_db_obj.get_list_of_journal_notes(filters=filters)
-        if not journal_note_exists:
+        snapshot = get_patient_snapshot()
+        if not snapshot.has_journal_note():
             solteq_app.create_journal_note(
                 note_message=config.JOURNAL_NOTE_DOCUMENT_MESSAGE,
                 checkmark_in_complete=True,
             )
 
-            time.sleep(3)  # Wait for the journal note to be created
-
-            check_journal_note_created = solteq_db_obj.get_list_of_journal_notes(
-                filters=filters
+            # Wait for the journal note to show up in the database
+            solteq_db_obj = get_solteq_database(
+                get_rpa_constant("srvapptmtsql03_connection_string")
             )
-
-            if not check_journal_note_created:
-                raise RuntimeError("Journal note creation failed.")
+            filters = journal_note_filters(snapshot.cpr)
+            try:
+                journal_notes = poll_until(
+                    lambda: solteq_db_obj.get_list_of_journal_notes(filters=filters),
+                    description="Created journal note",
+                )
+            except TimeoutError as e:
+                raise RuntimeError("Journal note creation failed.") from e
+            snapshot.journal_notes.extend(journal_notes)
 
         # Update journal note response metadata in RPA database
         update_response_metadata(
@@ -7,7 +7,7 @@ from mbu_dev_shared_components.os2forms.documents import download_file_bytes
 
 from helpers import config
 from helpers.context_handler import get_context_values, set_context_values
-from helpers.credential_constants import get_rpa_credentials
+from helpers.credential_constants import get_rpa_credentials, invalidate_rpa_cache
 
 logger = logging.getLogger(__name__)
 
@@ -98,4 +98,6 @@ def get_os2forms_document():
         raise
     except Exception as e:
         logger.error("An unexpected error occurred during receipt download: %s", e)
+        # The API key may have been rotated, so fetch it again next time
+        invalidate_rpa_cache("os2_api")
         raise
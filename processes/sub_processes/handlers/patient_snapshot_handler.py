@@ -0,0 +1,251 @@
+"""Module to load the patient's existing Solteq Tand data in one round-trip"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+
+from helpers import ats_functions, config
+from helpers.context_handler import get_context_values, set_context_values
+from helpers.credential_constants import get_rpa_constant
+from helpers.solteq_database import PooledSolteqTandDatabase, get_solteq_database
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PatientSnapshot:
+    """Documents, journal notes and extern dentist of a patient in Solteq Tand."""
+
+    cpr: str
+    documents: list[dict] = field(default_factory=list)
+    journal_notes: list[dict] = field(default_factory=list)
+    extern_dentists: list[dict] = field(default_factory=list)
+
+    def has_document(self, reference: str) -> bool:
+        """Check if a form document with the reference in its description exists."""
+        return any(is_document_for(document, reference) for document in self.documents)
+
+    def has_journal_note(self) -> bool:
+        """Check if the journal note for the form document exists."""
+        return bool(self.journal_notes)
+
+
+def is_document_for(document: dict, reference: str) -> bool:
+    """Check if a document has the reference in its description."""
+    return reference.lower() in str(document.get("DocumentDescription") or "").lower()
+
+
+def get_journal_note_lookup() -> str:
+    """Get the journal note description as it is stored in the database."""
+    return config.JOURNAL_NOTE_DOCUMENT_MESSAGE.replace(
+        "Administrativt notat ", ""
+    ).replace("'", "")
+
+
+def document_filters(cpr: str | list[str], reference: str | None = None) -> dict:
+    """Filters for the patients' form documents, optionally for one reference."""
+    filters = {
+        "p.cpr": cpr,
+        "ds.OriginalFilename": config.DOCUMENT_FILE_NAME,
+        "ds.DocumentType": config.DOCUMENT_TYPE,
+        "ds.rn": "1",
+        "ds.DocumentStoreStatusId": "1",
+    }
+    if reference is not None:
+        filters["ds.DocumentDescription"] = f"%{reference}%"
+    return filters
+
+
+def journal_note_filters(cpr: str) -> dict:
+    """Filters for the patient's form document journal notes."""
+    return {"p.cpr": cpr, "dn.Beskrivelse": get_journal_note_lookup()}
+
+
+@dataclass
+class PrescanEntry:
+    """Existing form document of a queued item at prescan."""
+
+    cpr: str
+    documents: list[dict] = field(default_factory=list)
+
+    @property
+    def document_exists(self) -> bool:
+        """Whether the item's form document is already journalized."""
+        return bool(self.documents)
+
+
+class PatientPrescanIndex:
+    """
+    Run-scoped reference -> existing document index.
+
+    Filled before processing by checking all pending items of the queue in a
+    few set-based queries, so items do not have to query for them one by one.
+
+    Journal notes are not prescanned. They are per patient, so an earlier item
+    of the same patient may create one, and are queried with the snapshot.
+    Entries are taken out when used, so a retry of the item in the same run
+    queries the database.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[str, PrescanEntry] = {}
+
+    def load(
+        self, solteq_db_obj: PooledSolteqTandDatabase, items: dict[str, str]
+    ) -> int:
+        """
+        Look up the existing form documents of the items.
+
+        Args:
+            solteq_db_obj (PooledSolteqTandDatabase): Database to query.
+            items (dict[str, str]): CPR number per item reference.
+
+        Returns:
+            int: Number of references in the index.
+        """
+        documents_by_cpr: dict[str, list[dict]] = {}
+
+        cprs = sorted(set(items.values()))
+        chunk_size = config.PATIENT_PRESCAN_CHUNK_SIZE
+        for start in range(0, len(cprs), chunk_size):
+            chunk = cprs[start : start + chunk_size]
+            documents = solteq_db_obj.get_list_of_documents(
+                filters=document_filters(chunk)
+            )
+            for document in documents:
+                documents_by_cpr.setdefault(str(document["cpr"]), []).append(document)
+
+        entries = {}
+        for reference, cpr in items.items():
+            # Only this item's document counts, the patient may have others
+            entries[reference] = PrescanEntry(
+                cpr=cpr,
+                documents=[
+                    document
+                    for document in documents_by_cpr.get(cpr, [])
+                    if is_document_for(document, reference)
+                ],
+            )
+
+        with self._lock:
+            self._entries = entries
+        return len(entries)
+
+    def count_documents_existing(self) -> int:
+        """Number of prescanned items whose document is already journalized."""
+        with self._lock:
+            return sum(entry.document_exists for entry in self._entries.values())
+
+    def take(self, reference: str, cpr: str) -> PrescanEntry | None:
+        """
+        Remove and get the entry of an item, if it was prescanned for the
+        same CPR.
+        """
+        with self._lock:
+            entry = self._entries.pop(str(reference), None)
+        if entry is None or entry.cpr != cpr:
+            return None
+        return entry
+
+
+_PRESCAN_INDEX = PatientPrescanIndex()
+
+
+def get_prescan_index() -> PatientPrescanIndex:
+    """Get the run-scoped reference -> existing document index."""
+    return _PRESCAN_INDEX
+
+
+def prescan_pending_items(pending_items: dict[str, dict]) -> None:
+    """
+    Check all pending items of the queue for existing form documents before
+    processing starts.
+
+    Failing to prescan is not fatal, as items then query for them one by one.
+
+    Args:
+        pending_items (dict[str, dict]): Workqueue rows of the pending items
+            by reference.
+    """
+    if not config.PATIENT_PRESCAN_ENABLED:
+        return
+
+    logger.info("Prescanning queued items for existing documents...")
+    try:
+        items = {}
+        for reference, row in pending_items.items():
+            cpr = ats_functions.get_row_item_data(row).get("cpr")
+            if cpr:
+                items[str(reference)] = str(cpr)
+
+        solteq_db_obj = get_solteq_database(
+            get_rpa_constant("srvapptmtsql03_connection_string")
+        )
+        index = get_prescan_index()
+        index.load(solteq_db_obj, items)
+        logger.info(
+            "Prescanned %d queued items. %d already have their document.",
+            len(items),
+            index.count_documents_existing(),
+        )
+    except Exception as e:
+        logger.warning("Could not prescan queued items: %s", e)
+
+
+def load_patient_snapshot() -> PatientSnapshot:
+    """
+    Load the patient's documents, journal notes and extern dentist in a single
+    round-trip and store the snapshot in the item context.
+
+    Returns:
+        PatientSnapshot: The loaded snapshot.
+    """
+    cpr = get_context_values("cpr")
+    solteq_db_obj = get_solteq_database(
+        get_rpa_constant("srvapptmtsql03_connection_string")
+    )
+
+    entry = get_prescan_index().take(get_context_values("reference"), cpr)
+    if entry is not None:
+        # Journal notes are queried live, as another item may have made one
+        logger.info("Loading patient snapshot documents from the prescan.")
+        documents = entry.documents
+        journal_notes, extern_dentists = solteq_db_obj.fetch_batch(
+            [
+                ("get_list_of_journal_notes", {"filters": journal_note_filters(cpr)}),
+                ("get_list_of_extern_dentist", {"filters": {"p.cpr": cpr}}),
+            ]
+        )
+    else:
+        logger.info("Loading patient snapshot from the SolteqTand database.")
+        documents, journal_notes, extern_dentists = solteq_db_obj.fetch_batch(
+            [
+                ("get_list_of_documents", {"filters": document_filters(cpr)}),
+                ("get_list_of_journal_notes", {"filters": journal_note_filters(cpr)}),
+                ("get_list_of_extern_dentist", {"filters": {"p.cpr": cpr}}),
+            ]
+        )
+
+    snapshot = PatientSnapshot(
+        cpr=cpr,
+        documents=list(documents),
+        journal_notes=list(journal_notes),
+        extern_dentists=extern_dentists,
+    )
+    set_context_values(patient_snapshot=snapshot)
+    logger.info(
+        "Patient snapshot loaded with %d documents, %d journal notes and %d extern dentists.",
+        len(documents),
+        len(journal_notes),
+        len(extern_dentists),
+    )
+    return snapshot
+
+
+def get_patient_snapshot() -> PatientSnapshot:
+    """Get the item's patient snapshot, loading it if it is not in the context."""
+    snapshot = get_context_values("patient_snapshot")
+    if snapshot is None:
+        snapshot = load_patient_snapshot()
+    return snapshot
@@ -2,13 +2,122 @@
 
 import logging
 import os
+import re
+import threading
+import time
 
 from mbu_dev_shared_components.solteqtand.database import SolteqTandDatabase
 
+from helpers import config
 from helpers.context_handler import get_context_values, set_context_values
+from helpers.solteq_database import get_solteq_database
 
 logger = logging.getLogger(__name__)
 
+DANISH_PHONE_NUMBER_LENGTH = 8
+
+
+def normalize_phone_number(phone_number) -> str:
+    """Reduce a phone number to its digits, without the Danish country code."""
+    digits = re.sub(r"\D", "", str(phone_number or ""))
+    if len(digits) == DANISH_PHONE_NUMBER_LENGTH + 2 and digits.startswith("45"):
+        digits = digits[2:]
+    return digits
+
+
+def normalize_contractor_id(contractor_id) -> str:
+    """Normalize a contractor ID (ydernummer) for comparison."""
+    return str(contractor_id or "").strip()
+
+
+class ClinicDirectory:
+    """
+    Run-scoped copy of the Solteq Tand clinic table, indexed by normalized
+    phone number and by contractorId.
+
+    The table is small and rarely changes, so it is loaded once and reloaded
+    when the TTL runs out, or on a lookup miss if the copy is older than the
+    miss refresh interval.
+    """
+
+    def __init__(self, ttl: float, miss_refresh_interval: float) -> None:
+        self.ttl = ttl
+        self.miss_refresh_interval = miss_refresh_interval
+        self._lock = threading.Lock()
+        self._clinics: list[dict] = []
+        self._by_phone: dict[str, list[int]] = {}
+        self._by_contractor: dict[str, list[int]] = {}
+        self._loaded_at: float | None = None
+
+    def load(self, database: SolteqTandDatabase) -> None:
+        """Load all clinics from the database and rebuild the indexes."""
+        logger.info("Loading clinic directory from the SolteqTand database.")
+        clinics = database.get_list_of_clinics()
+
+        by_phone: dict[str, list[int]] = {}
+        by_contractor: dict[str, list[int]] = {}
+        for index, clinic in enumerate(clinics):
+            phone = normalize_phone_number(clinic.get("phoneNumber"))
+            if phone:
+                by_phone.setdefault(phone, []).append(index)
+            contractor_id = normalize_contractor_id(clinic.get("contractorId"))
+            if contractor_id:
+                by_contractor.setdefault(contractor_id, []).append(index)
+
+        self._clinics = clinics
+        self._by_phone = by_phone
+        self._by_contractor = by_contractor
+        self._loaded_at = time.monotonic()
+        logger.info("Clinic directory loaded with %d clinics.", len(clinics))
+
+    def lookup(
+        self, database: SolteqTandDatabase, phone_number, contractor_id
+    ) -> list[dict]:
+        """
+        Find the clinics matching either the phone number or the contractor ID.
+
+        Args:
+            database (SolteqTandDatabase): Database to load clinics from when needed.
+            phone_number: Phone number of the clinic.
+            contractor_id: Contractor ID (ydernummer) of the clinic.
+
+        Returns:
+            list[dict]: Matching clinics in table order. More than one match
+                means the phone number matches several clinics.
+        """
+        with self._lock:
+            if self._loaded_at is None or self._age() > self.ttl:
+                self.load(database)
+
+            result = self._find(phone_number, contractor_id)
+            if not result and self._age() > self.miss_refresh_interval:
+                logger.info("Clinic not found in directory. Reloading.")
+                self.load(database)
+                result = self._find(phone_number, contractor_id)
+
+            return result
+
+    def _age(self) -> float:
+        return time.monotonic() - (self._loaded_at or 0)
+
+    def _find(self, phone_number, contractor_id) -> list[dict]:
+        indexes = set(self._by_phone.get(normalize_phone_number(phone_number), []))
+        indexes.update(
+            self._by_contractor.get(normalize_contractor_id(contractor_id), [])
+        )
+        return [self._clinics[i] for i in sorted(indexes)]
+
+
+_CLINIC_DIRECTORY = ClinicDirectory(
+    ttl=config.CLINIC_DIRECTORY_TTL,
+    miss_refresh_interval=config.CLINIC_DIRECTORY_MISS_REFRESH_INTERVAL,
+)
+
+
+def get_clinic_directory() -> ClinicDirectory:
+    """Get the run-scoped clinic directory."""
+    return _CLINIC_DIRECTORY
+
 
 def check_if_clinic_is_in_database() -> bool:
     """
@@ -22,16 +131,15 @@ def check_if_clinic_is_in_database() -> bool:
     """
     try:
         logger.info("Checking if clinic exists in the SolteqTand database.")
-        database = SolteqTandDatabase(
+        database = get_solteq_database(
             os.environ.get("DBCONNECTIONSTRINGSOLTEQTAND", "")
         )
 
-        filters = {
-            "phoneNumber": get_context_values("clinic_phone_number"),
-            "contractorId": get_context_values("clinic_provider_number"),
-        }
-
-        result = database.get_list_of_clinics(or_filters=[filters])
+        result = get_clinic_directory().lookup(
+            database,
+            phone_number=get_context_values("clinic_phone_number"),
+            contractor_id=get_context_values("clinic_provider_number"),
+        )
         set_context_values(private_clinic_data=result)
 
         exists = result is not None and len(result) > 0
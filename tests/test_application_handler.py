@@ -0,0 +1,232 @@
+"""Lifecycle tests for the application handler against a fake Solteq Tand"""
+
+import contextlib
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import psutil
+
+from helpers import config
+from processes import application_handler
+
+
+class FakeSolteqTandApp:
+    """Stand-in for SolteqTandApp with the parts the handler uses."""
+
+    def __init__(self) -> None:
+        self.username = None
+        self.password = None
+        self.app_window = None
+        self.process: psutil.Process | None = None
+
+    def login(self) -> None:
+        if self.process is None or not application_handler._is_alive(self.process):
+            raise RuntimeError("Application process is not running.")
+        self.app_window = object()
+
+    def close_window(self, _window: object) -> None:
+        # Closing the main window exits the application
+        self.process.kill()
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "uses /proc process names")
+class ApplicationLifecycleTest(unittest.TestCase):
+    """Run the lifecycle against sleeping processes named TMTand.exe."""
+
+    def setUp(self) -> None:
+        # Processes are named after their executable, so link one as TMTand.exe
+        self.tmp = tempfile.TemporaryDirectory()
+        self.exe = os.path.join(self.tmp.name, "TMTand.exe")
+        os.symlink(sys.executable, self.exe)
+        self.processes: list[psutil.Popen] = []
+
+        patches = [
+            mock.patch.object(config, "WARM_STANDBY", True),
+            mock.patch.object(config, "APP_KILL_TIMEOUT", 5),
+            mock.patch.object(application_handler, "preload_rpa_values"),
+            mock.patch.object(application_handler, "invalidate_rpa_cache"),
+            mock.patch.object(
+                application_handler,
+                "get_rpa_credentials",
+                return_value={"username": "user", "decrypted_password": "password"},
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        application_handler.set_app_factory(self.launch)
+        self.addCleanup(
+            application_handler.set_app_factory, application_handler.launch_solteq_tand
+        )
+        self.addCleanup(self.reset_state)
+
+    def launch(self) -> tuple[FakeSolteqTandApp, psutil.Process]:
+        process = psutil.Popen([self.exe, "-c", "import time; time.sleep(60)"])
+        self.processes.append(process)
+        application = FakeSolteqTandApp()
+        application.process = process
+        return application, process
+
+    def reset_state(self) -> None:
+        application_handler.APP = None
+        application_handler.APP_PROCESS = None
+        application_handler.STANDBY = None
+        for process in self.processes:
+            with contextlib.suppress(psutil.NoSuchProcess):
+                process.kill()
+            process.wait()
+        self.tmp.cleanup()
+
+    def wait_dead(self, process: psutil.Process) -> bool:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if not application_handler._is_alive(process):
+                return True
+            time.sleep(0.05)
+        return False
+
+    def test_close_kills_launched_application(self) -> None:
+        application_handler.startup()
+        process = application_handler.APP_PROCESS
+
+        application_handler.close()
+
+        self.assertTrue(self.wait_dead(process))
+        self.assertIsNone(application_handler.get_app())
+        self.assertIsNone(application_handler.APP_PROCESS)
+
+    def test_soft_close_leaves_standby_running(self) -> None:
+        application_handler.startup()
+        process = application_handler.APP_PROCESS
+        application_handler.start_standby()
+        _, standby = application_handler.STANDBY
+
+        with mock.patch.object(application_handler, "hard_close") as hard_close:
+            application_handler.close()
+
+        hard_close.assert_not_called()
+        self.assertFalse(application_handler._is_alive(process))
+        self.assertTrue(application_handler._is_alive(standby))
+
+    def test_close_without_application_kills_nothing(self) -> None:
+        _, other = self.launch()
+
+        application_handler.close()
+
+        self.assertTrue(application_handler._is_alive(other))
+
+    def test_reset_switches_to_standby(self) -> None:
+        application_handler.startup()
+        old = application_handler.APP_PROCESS
+        application_handler.start_standby()
+        standby_app, standby = application_handler.STANDBY
+
+        application_handler.reset()
+
+        self.assertTrue(self.wait_dead(old))
+        self.assertIs(application_handler.get_app(), standby_app)
+        self.assertIs(application_handler.APP_PROCESS, standby)
+        self.assertIsNone(application_handler.STANDBY)
+
+    def test_reset_keeps_standby_when_application_already_closed(self) -> None:
+        # E.g. a stuck session closed after the item, leaving no PID to kill by
+        application_handler.startup()
+        application_handler.close()
+        application_handler.start_standby()
+        standby_app, standby = application_handler.STANDBY
+
+        application_handler.reset()
+
+        self.assertTrue(application_handler._is_alive(standby))
+        self.assertIs(application_handler.get_app(), standby_app)
+        self.assertIs(application_handler.APP_PROCESS, standby)
+
+    def test_reset_falls_back_to_new_launch_when_standby_died(self) -> None:
+        application_handler.startup()
+        application_handler.start_standby()
+        _, standby = application_handler.STANDBY
+        standby.kill()
+        self.assertTrue(self.wait_dead(standby))
+
+        application_handler.reset()
+
+        self.assertIsNotNone(application_handler.get_app())
+        self.assertIsNot(application_handler.APP_PROCESS, standby)
+        self.assertTrue(application_handler.is_running())
+
+    def test_discard_standby_kills_it(self) -> None:
+        application_handler.start_standby()
+        _, standby = application_handler.STANDBY
+
+        application_handler.discard_standby()
+
+        self.assertTrue(self.wait_dead(standby))
+        self.assertIsNone(application_handler.STANDBY)
+
+
+class FakeWindow:
+    """Window with the parts of a uiautomation control the handler uses."""
+
+    def __init__(self, automation_id: str, exists: bool = True) -> None:
+        self.AutomationId = automation_id  # noqa: N815
+        self.exists = exists
+
+    def Exists(self, *_args: float) -> bool:  # noqa: N802
+        return self.exists
+
+
+class PrepareSessionTest(unittest.TestCase):
+    """Return the application to its main window between items."""
+
+    def setUp(self) -> None:
+        self.application = FakeSolteqTandApp()
+        self.application.close_patient_window = self.close_patient_window
+        self.main_window = FakeWindow("FormFront")
+        patches = [
+            mock.patch.object(config, "SESSION_REUSE", True),
+            mock.patch.object(config, "SESSION_MAX_ITEMS", 100),
+            mock.patch.object(config, "SESSION_MAX_AGE", 3600),
+            mock.patch.object(application_handler, "APP", self.application),
+            mock.patch.object(
+                application_handler, "SESSION_STARTED_AT", time.monotonic()
+            ),
+            mock.patch.object(application_handler, "SESSION_ITEM_COUNT", 0),
+            mock.patch.object(application_handler, "close"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def close_patient_window(self) -> None:
+        self.application.app_window = self.main_window
+
+    def test_closes_patient_window_and_keeps_session(self) -> None:
+        self.application.app_window = FakeWindow("FormPatient")
+
+        application_handler.prepare_session_for_next_item()
+
+        self.assertIs(self.application.app_window, self.main_window)
+        application_handler.close.assert_not_called()
+
+    def test_closes_session_on_other_window(self) -> None:
+        self.application.app_window = FakeWindow("FormBooking")
+
+        application_handler.prepare_session_for_next_item()
+
+        application_handler.close.assert_called_once()
+
+    def test_closes_session_when_main_window_is_gone(self) -> None:
+        self.application.app_window = FakeWindow("FormFront", exists=False)
+
+        application_handler.prepare_session_for_next_item()
+
+        application_handler.close.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Tests for the adaptive concurrency limiter"""
+
+import unittest
+from unittest import mock
+
+from helpers import config
+from helpers.concurrency_limiter import AdaptiveLimiter
+
+
+class AdaptiveLimiterRecordTest(unittest.TestCase):
+    """Adjust the limit from recorded call outcomes."""
+
+    def setUp(self) -> None:
+        patches = [
+            mock.patch.object(config, "MIN_CONCURRENCY", 2),
+            mock.patch.object(config, "MAX_CONCURRENCY", 20),
+            mock.patch.object(config, "INITIAL_CONCURRENCY", 10),
+            mock.patch.object(config, "CONCURRENCY_LATENCY_TOLERANCE", 2.0),
+            mock.patch.object(config, "CONCURRENCY_SHORT_WINDOW", 5),
+            mock.patch.object(config, "CONCURRENCY_LONG_WINDOW", 50),
+            mock.patch.object(config, "CONCURRENCY_BACKOFF_FACTOR", 0.5),
+            mock.patch.object(config, "CONCURRENCY_MAX_ERROR_RATE", 0.2),
+            mock.patch.object(config, "CONCURRENCY_DECREASE_COOLDOWN", 0),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def record_many(
+        self, limiter: AdaptiveLimiter, count: int, latency: float = 1.0
+    ) -> None:
+        for _ in range(count):
+            limiter.record(latency, failed=False)
+
+    def test_healthy_calls_increase_by_one_per_limit(self) -> None:
+        limiter = AdaptiveLimiter("test")
+
+        # 1/10 + 1/10.1 + ... reaches one after eleven calls
+        self.record_many(limiter, 10)
+        self.assertEqual(limiter.limit, 10)
+        self.record_many(limiter, 1)
+        self.assertEqual(limiter.limit, 11)
+
+    def test_slow_calls_decrease(self) -> None:
+        limiter = AdaptiveLimiter("test")
+        self.record_many(limiter, 20)
+        before = limiter.limit
+
+        self.record_many(limiter, 5, latency=10.0)
+
+        self.assertLess(limiter.limit, before)
+
+    def test_sustained_slowness_stays_slow(self) -> None:
+        limiter = AdaptiveLimiter("test")
+        self.record_many(limiter, 20)
+
+        # Without a frozen baseline, the slow calls would become the norm
+        self.record_many(limiter, 200, latency=10.0)
+
+        self.assertEqual(limiter.limit, limiter.floor)
+        self.assertLess(limiter._baseline_latency, 2.0)
+
+    def test_single_failure_is_tolerated(self) -> None:
+        limiter = AdaptiveLimiter("test")
+        self.record_many(limiter, 5)
+        before = limiter.limit
+
+        limiter.record(1.0, failed=True)
+
+        self.assertEqual(limiter.limit, before)
+
+    def test_error_rate_above_tolerance_decreases(self) -> None:
+        limiter = AdaptiveLimiter("test")
+        self.record_many(limiter, 5)
+
+        limiter.record(1.0, failed=True)
+        limiter.record(1.0, failed=True)
+
+        self.assertEqual(limiter.limit, 5)
+
+    def test_cooldown_counts_a_burst_of_failures_once(self) -> None:
+        limiter = AdaptiveLimiter("test")
+
+        with mock.patch.object(config, "CONCURRENCY_DECREASE_COOLDOWN", 60):
+            for _ in range(5):
+                limiter.record(1.0, failed=True)
+
+        self.assertEqual(limiter.limit, 5)
+
+    def test_limit_stays_within_floor_and_ceiling(self) -> None:
+        limiter = AdaptiveLimiter("test")
+
+        for _ in range(10):
+            limiter.record(1.0, failed=True)
+        self.assertEqual(limiter.limit, 2)
+
+        self.record_many(limiter, 1000)
+        self.assertEqual(limiter.limit, 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Tests for the RPA constant and credential cache"""
+
+import threading
+import time
+import unittest
+from unittest import mock
+
+from helpers import config, credential_constants
+
+
+class FakeRPAConnection:
+    """Stand-in for RPAConnection serving constants from a dict."""
+
+    constants: dict[str, str] = {}
+    delays: dict[str, float] = {}
+    fetched: list[str] = []
+
+    def __init__(self, **_kwargs) -> None:
+        pass
+
+    def __enter__(self) -> "FakeRPAConnection":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+    def get_constant(self, name: str) -> dict:
+        self.fetched.append(name)
+        time.sleep(self.delays.get(name, 0))
+        if name not in self.constants:
+            raise ValueError(f"Constant {name} not found")
+        return {"value": self.constants[name]}
+
+
+class RpaCacheTest(unittest.TestCase):
+    """Look up constants through a fake RPAConnection."""
+
+    def setUp(self) -> None:
+        FakeRPAConnection.constants = {"a": "value a", "b": "value b", "empty": ""}
+        FakeRPAConnection.delays = {}
+        FakeRPAConnection.fetched = []
+        patch = mock.patch.object(
+            credential_constants, "RPAConnection", FakeRPAConnection
+        )
+        patch.start()
+        self.addCleanup(patch.stop)
+        credential_constants.invalidate_rpa_cache()
+        self.addCleanup(credential_constants.invalidate_rpa_cache)
+
+    def test_caches_found_value(self) -> None:
+        self.assertEqual(credential_constants.get_rpa_constant("a"), "value a")
+        self.assertEqual(credential_constants.get_rpa_constant("a"), "value a")
+
+        self.assertEqual(FakeRPAConnection.fetched, ["a"])
+
+    def test_fetches_again_after_ttl(self) -> None:
+        credential_constants.get_rpa_constant("a")
+        with mock.patch.object(config, "RPA_CACHE_TTL", -1):
+            credential_constants.get_rpa_constant("a")
+
+        self.assertEqual(FakeRPAConnection.fetched, ["a", "a"])
+
+    def test_does_not_cache_empty_value(self) -> None:
+        credential_constants.get_rpa_constant("empty")
+        credential_constants.get_rpa_constant("empty")
+
+        self.assertEqual(FakeRPAConnection.fetched, ["empty", "empty"])
+
+    def test_missing_constant_raises_every_time(self) -> None:
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                credential_constants.get_rpa_constant("missing")
+
+        self.assertEqual(FakeRPAConnection.fetched, ["missing", "missing"])
+
+    def test_invalidate_drops_value(self) -> None:
+        credential_constants.get_rpa_constant("a")
+        credential_constants.invalidate_rpa_cache("a")
+        credential_constants.get_rpa_constant("a")
+
+        self.assertEqual(FakeRPAConnection.fetched, ["a", "a"])
+
+    def test_slow_fetch_does_not_hold_up_other_keys(self) -> None:
+        FakeRPAConnection.delays = {"a": 1.0}
+        slow = threading.Thread(
+            target=credential_constants.get_rpa_constant, args=("a",)
+        )
+        slow.start()
+        time.sleep(0.1)
+
+        started = time.monotonic()
+        credential_constants.get_rpa_constant("b")
+        elapsed = time.monotonic() - started
+        slow.join()
+
+        self.assertLess(elapsed, 0.5)
+
+    def test_concurrent_lookups_of_one_key_fetch_once(self) -> None:
+        FakeRPAConnection.delays = {"a": 0.2}
+        threads = [
+            threading.Thread(target=credential_constants.get_rpa_constant, args=("a",))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(FakeRPAConnection.fetched, ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
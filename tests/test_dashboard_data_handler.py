@@ -0,0 +1,243 @@
+"""Tests for the dashboard run and metadata caches"""
+
+import re
+import unittest
+from http import HTTPStatus
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from helpers import config
+from helpers.context_handler import Scope
+from processes.sub_processes.handlers import dashboard_data_handler
+
+
+class FakeResponse:
+    """Response with the parts of requests.Response the handler uses."""
+
+    def __init__(self, data: object, status_code: int = 200) -> None:
+        self.data = data
+        self.status_code = status_code
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= HTTPStatus.BAD_REQUEST:
+            raise requests.HTTPError(f"{self.status_code}", response=self)
+
+    def json(self) -> object:
+        return self.data
+
+
+class FakeRunsClient:
+    """Serves pages of runs, newest first."""
+
+    def __init__(self, runs: list[dict]) -> None:
+        self.runs = runs
+        self.pages_read: list[int] = []
+
+    def get(self, path: str) -> FakeResponse:
+        query = parse_qs(urlparse(path).query)
+        page, size = int(query["page"][0]), int(query["size"][0])
+        self.pages_read.append(page)
+        items = self.runs[(page - 1) * size : page * size]
+        pages = -(-len(self.runs) // size)
+        return FakeResponse({"items": items, "pages": pages})
+
+
+def make_runs(count: int) -> list[dict]:
+    """Runs for CPR numbers 0..count-1, one per day, newest first."""
+    return [
+        {
+            "id": i,
+            "meta": {"cpr": str(i)},
+            "created_at": f"2026-01-{31 - i // 24:02d}T{23 - i % 24:02d}:00:00Z",
+        }
+        for i in range(count)
+    ]
+
+
+class FakeMetadataClient:
+    """Serves the process list, the steps and the step runs of one process."""
+
+    def __init__(self) -> None:
+        self.steps = {"step": 5}
+        self.step_runs = {(10, 5): {"id": 50}}
+        self.paths: list[str] = []
+
+    def get(self, path: str) -> FakeResponse:
+        self.paths.append(path)
+        if path.startswith("/processes/"):
+            return FakeResponse({"items": [{"name": "process", "id": 1}]})
+        if path.startswith("/steps/process/"):
+            return FakeResponse([{"name": n, "id": i} for n, i in self.steps.items()])
+        run_id, step_id = map(int, re.findall(r"\d+", path))
+        step_run = self.step_runs.get((run_id, step_id))
+        return FakeResponse(step_run, status_code=200 if step_run else 404)
+
+    def loads(self, prefix: str) -> int:
+        return sum(path.startswith(prefix) for path in self.paths)
+
+
+class DashboardMetadataResolverTest(unittest.TestCase):
+    """Resolve process and step IDs from the cached lists."""
+
+    def setUp(self) -> None:
+        self.client = FakeMetadataClient()
+        self.resolver = dashboard_data_handler.DashboardMetadataResolver(ttl=3600)
+
+    def test_loads_process_list_once(self) -> None:
+        for _ in range(3):
+            self.assertEqual(self.resolver.get_process_id("process", self.client), 1)
+
+        self.assertEqual(self.client.loads("/processes/"), 1)
+
+    def test_loads_steps_once_per_process(self) -> None:
+        for _ in range(3):
+            self.assertEqual(self.resolver.get_step_id(1, "step", self.client), 5)
+
+        self.assertEqual(self.client.loads("/steps/"), 1)
+
+    def test_reloads_after_ttl(self) -> None:
+        self.resolver.get_process_id("process", self.client)
+        self.resolver.ttl = -1
+
+        self.resolver.get_process_id("process", self.client)
+
+        self.assertEqual(self.client.loads("/processes/"), 2)
+
+    def test_invalidate_reloads(self) -> None:
+        self.resolver.get_step_id(1, "step", self.client)
+        self.resolver.invalidate()
+
+        self.resolver.get_step_id(1, "step", self.client)
+
+        self.assertEqual(self.client.loads("/steps/"), 2)
+
+    def test_unknown_names_raise(self) -> None:
+        with self.assertRaises(ValueError):
+            self.resolver.get_process_id("other", self.client)
+        with self.assertRaises(ValueError):
+            self.resolver.get_step_id(1, "other", self.client)
+
+    def test_stale_step_id_is_reloaded_on_not_found(self) -> None:
+        resolver = self.resolver
+        with mock.patch.object(dashboard_data_handler, "_METADATA_RESOLVER", resolver):
+            resolver.get_step_id(1, "step", self.client)
+            # The step was recreated with a new ID
+            self.client.steps = {"step": 6}
+            self.client.step_runs = {(10, 6): {"id": 60}}
+
+            step_run_id = dashboard_data_handler._get_step_run_id(
+                1, 10, "step", self.client
+            )
+
+        self.assertEqual(step_run_id, 60)
+        self.assertEqual(self.client.loads("/steps/"), 2)
+
+
+class DashboardRunCacheTest(unittest.TestCase):
+    """Prefetch the runs of the queued CPR numbers."""
+
+    def setUp(self) -> None:
+        patch = mock.patch.object(config, "DASHBOARD_RUNS_PAGE_SIZE", 10)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.cache = dashboard_data_handler.DashboardRunCache()
+
+    def test_stops_when_all_cprs_are_found(self) -> None:
+        client = FakeRunsClient(make_runs(100))
+
+        count = self.cache.load(process_id=1, client=client, cprs={"3", "15"})
+
+        self.assertEqual(count, 2)
+        self.assertEqual(client.pages_read, [1, 2])
+        self.assertEqual(self.cache.get("15")["id"], 15)
+
+    def test_only_indexes_queued_cprs(self) -> None:
+        client = FakeRunsClient(make_runs(30))
+
+        self.cache.load(process_id=1, client=client, cprs={"3"})
+
+        self.assertIsNone(self.cache.get("4"))
+
+    def test_stops_at_runs_older_than_created_after(self) -> None:
+        client = FakeRunsClient(make_runs(100))
+        created_after = dashboard_data_handler._parse_timestamp("2026-01-31T05:00:00Z")
+
+        self.cache.load(
+            process_id=1, client=client, cprs={"99"}, created_after=created_after
+        )
+
+        # The run of CPR 18 is at 05:00, the last on page 2 is older
+        self.assertEqual(client.pages_read, [1, 2])
+        self.assertIsNone(self.cache.get("99"))
+
+    def test_reads_to_the_end_for_missing_cpr(self) -> None:
+        client = FakeRunsClient(make_runs(25))
+
+        self.cache.load(process_id=1, client=client, cprs={"missing"})
+
+        self.assertEqual(client.pages_read, [1, 2, 3])
+
+    def test_expired_run_is_a_miss(self) -> None:
+        self.cache.put("1", {"id": 1})
+
+        with mock.patch.object(config, "DASHBOARD_RUN_CACHE_TTL", -1):
+            self.assertIsNone(self.cache.get("1"))
+        self.assertEqual(self.cache.get("1"), {"id": 1})
+
+
+class RefreshDashboardItemRunTest(unittest.TestCase):
+    """Refresh the item's run snapshot from the API."""
+
+    def setUp(self) -> None:
+        scope = Scope(fresh=True, cpr="1", dashboard_client=object())
+        scope.__enter__()
+        self.addCleanup(scope.__exit__, None, None, None)
+
+        self.item_run = dashboard_data_handler.DashboardItemRun(
+            run_id=10, step_run_ids={"step": 100}, meta={"old": True}
+        )
+        patches = [
+            mock.patch.object(
+                dashboard_data_handler,
+                "get_dashboard_item_run",
+                return_value=self.item_run,
+            ),
+            mock.patch.object(
+                dashboard_data_handler, "get_dashboard_process_id", return_value=1
+            ),
+            mock.patch.object(
+                dashboard_data_handler,
+                "_get_step_run_id",
+                side_effect=lambda _process_id, run_id, *_: run_id * 10 + 1,
+            ),
+            mock.patch.object(config, "DASHBOARD_STEP_NAMES", ("step",)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def refresh(self, run: dict) -> None:
+        with mock.patch.object(
+            dashboard_data_handler,
+            "get_dashboard_process_data",
+            return_value={"items": [run]},
+        ):
+            dashboard_data_handler.refresh_dashboard_item_run()
+
+    def test_same_run_keeps_step_runs(self) -> None:
+        self.refresh({"id": 10, "meta": {"new": True}})
+
+        self.assertEqual(self.item_run.step_run_ids, {"step": 100})
+        self.assertEqual(self.item_run.meta, {"new": True})
+
+    def test_new_run_resolves_its_step_runs(self) -> None:
+        self.refresh({"id": 20, "meta": {}})
+
+        self.assertEqual(self.item_run.run_id, 20)
+        self.assertEqual(self.item_run.step_run_ids, {"step": 201})
+
+
+if __name__ == "__main__":
+    unittest.main()
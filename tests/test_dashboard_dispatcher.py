@@ -0,0 +1,99 @@
+"""Tests for the dashboard step run dispatcher"""
+
+import time
+import unittest
+
+from helpers.dashboard_dispatcher import StepRunDispatcher, StepRunUpdate
+
+
+def make_update(
+    step_run_id: int, status: str, started_at: str, failure: dict | None = None
+) -> StepRunUpdate:
+    return StepRunUpdate(
+        step_run_id=step_run_id,
+        step_name=f"step {step_run_id}",
+        update_data={
+            "status": status,
+            "started_at": started_at,
+            "finished_at": started_at,
+            "failure": failure,
+            "rerun_config": {},
+        },
+    )
+
+
+class StepRunDispatcherTest(unittest.TestCase):
+    """Deliver updates through a recording send function."""
+
+    def setUp(self) -> None:
+        self.sent: list[StepRunUpdate] = []
+        self.fail_sends = False
+
+    def wait_sent(self, count: int) -> None:
+        deadline = time.monotonic() + 5
+        while len(self.sent) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def send(self, update: StepRunUpdate) -> None:
+        if self.fail_sends:
+            raise RuntimeError("dashboard down")
+        self.sent.append(update)
+
+    def test_coalesces_updates_within_window(self) -> None:
+        # A long window keeps updates queued until drain
+        dispatcher = StepRunDispatcher(send=self.send, window=60)
+        dispatcher.submit(make_update(1, "running", "t1"))
+        dispatcher.submit(make_update(1, "success", "t2"))
+
+        self.assertEqual(dispatcher.drain(timeout=5), [])
+
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(self.sent[0].update_data["status"], "success")
+        # The step run started with the first update
+        self.assertEqual(self.sent[0].update_data["started_at"], "t1")
+        self.assertEqual(dispatcher.coalesced, 1)
+
+    def test_keeps_step_runs_apart(self) -> None:
+        dispatcher = StepRunDispatcher(send=self.send, window=60)
+        dispatcher.submit(make_update(1, "running", "t1"))
+        dispatcher.submit(make_update(2, "running", "t1"))
+
+        dispatcher.drain(timeout=5)
+
+        self.assertEqual([u.step_run_id for u in self.sent], [1, 2])
+
+    def test_drops_repeated_failure_with_new_traceback(self) -> None:
+        dispatcher = StepRunDispatcher(send=self.send)
+        first = {"error_code": "E1", "message": "failed", "details": "<tb at 0x1>"}
+        second = {"error_code": "E1", "message": "failed", "details": "<tb at 0x2>"}
+        dispatcher.submit(make_update(1, "failed", "t1", first))
+        # Wait for the first delivery, so the second is not coalesced into it
+        self.wait_sent(1)
+        dispatcher.submit(make_update(1, "failed", "t1", second))
+        dispatcher.drain(timeout=5)
+
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(dispatcher.duplicates_dropped, 1)
+
+    def test_sends_different_failure(self) -> None:
+        dispatcher = StepRunDispatcher(send=self.send)
+        dispatcher.submit(make_update(1, "failed", "t1", {"message": "one"}))
+        self.wait_sent(1)
+        dispatcher.submit(make_update(1, "failed", "t1", {"message": "two"}))
+        dispatcher.drain(timeout=5)
+
+        self.assertEqual(len(self.sent), 2)
+
+    def test_drain_returns_undelivered_updates(self) -> None:
+        self.fail_sends = True
+        dispatcher = StepRunDispatcher(send=self.send, window=60)
+        update = make_update(1, "running", "t1")
+        dispatcher.submit(update)
+
+        undelivered = dispatcher.drain(timeout=5)
+
+        self.assertEqual([u.step_run_id for u in undelivered], [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Tests for the business exception catalog"""
+
+import unittest
+from unittest import mock
+
+from helpers import config, exception_catalog
+from helpers.exception_catalog import ExceptionCatalog
+
+
+class CodedError(Exception):
+    """Error carrying an exception code."""
+
+    def __init__(self, message: str, code: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+class ExceptionCatalogTest(unittest.TestCase):
+    """Load the catalog and classify errors against it."""
+
+    def setUp(self) -> None:
+        self.catalog = ExceptionCatalog()
+        self.get_exceptions = mock.Mock(
+            return_value=[
+                {"exception_code": "E1", "message_text": "Patient not found"},
+                {"exception_code": "E2", "message_text": "No clinic for {cpr}"},
+            ]
+        )
+        patch = mock.patch.object(
+            exception_catalog, "get_exceptions", self.get_exceptions
+        )
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_classifies_by_code_message_and_pattern(self) -> None:
+        self.catalog.ensure_loaded("conn")
+
+        self.assertEqual(self.catalog.classify(CodedError("other", "e1")).code, "E1")
+        self.assertEqual(
+            self.catalog.classify(RuntimeError("patient  NOT found")).code, "E1"
+        )
+        self.assertEqual(
+            self.catalog.classify(RuntimeError("No clinic for 0101")).code, "E2"
+        )
+        self.assertIsNone(self.catalog.classify(RuntimeError("Unknown")))
+
+    def test_loads_once(self) -> None:
+        self.catalog.ensure_loaded("conn")
+        self.catalog.ensure_loaded("conn")
+
+        self.assertEqual(self.get_exceptions.call_count, 1)
+
+    def test_failed_load_is_not_retried_within_delay(self) -> None:
+        self.get_exceptions.side_effect = ConnectionError("database down")
+
+        with self.assertRaises(ConnectionError):
+            self.catalog.ensure_loaded("conn")
+        self.catalog.ensure_loaded("conn")
+
+        self.assertEqual(self.get_exceptions.call_count, 1)
+
+    def test_failed_load_is_retried_after_delay(self) -> None:
+        self.get_exceptions.side_effect = [ConnectionError("database down"), []]
+
+        with self.assertRaises(ConnectionError):
+            self.catalog.ensure_loaded("conn")
+        with mock.patch.object(config, "EXCEPTION_CATALOG_RETRY_DELAY", -1):
+            self.catalog.ensure_loaded("conn")
+
+        self.assertEqual(self.get_exceptions.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+"""Tests for the journalizing status tracker and write buffer"""
+
+import unittest
+from unittest import mock
+
+from helpers.context_handler import Scope
+from processes.sub_processes.handlers import journalizing_db_handler
+from processes.sub_processes.handlers.journalizing_db_handler import (
+    JournalizingWriteBuffer,
+    ProcessStatusTracker,
+)
+
+
+class FakeCursor:
+    """Cursor recording the batch it runs, or failing it."""
+
+    def __init__(self, error: Exception | None) -> None:
+        self.error = error
+        self.executed: list[tuple[str, list]] = []
+
+    def execute(self, batch: str, params: list) -> None:
+        if self.error is not None:
+            raise self.error
+        self.executed.append((batch, params))
+
+    def nextset(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        pass
+
+
+class FakeConnection:
+    """Connection handing out one FakeCursor."""
+
+    def __init__(self, error: Exception | None = None) -> None:
+        self.cursor_obj = FakeCursor(error)
+        self.committed = False
+        self.rolled_back = False
+
+    def cursor(self) -> FakeCursor:
+        return self.cursor_obj
+
+    def commit(self) -> None:
+        self.committed = True
+
+    def rollback(self) -> None:
+        self.rolled_back = True
+
+    def close(self) -> None:
+        pass
+
+
+class ProcessStatusTrackerTest(unittest.TestCase):
+    """Decide which status writes are needed."""
+
+    def setUp(self) -> None:
+        self.tracker = ProcessStatusTracker()
+
+    def test_first_status_is_written(self) -> None:
+        self.assertTrue(self.tracker.should_write("ref", "InProgress", None))
+
+    def test_repeated_status_is_skipped(self) -> None:
+        self.tracker.mark_persisted("ref", "InProgress")
+
+        self.assertFalse(self.tracker.should_write("ref", "InProgress", None))
+        self.assertEqual(self.tracker.skipped, 1)
+
+    def test_finished_item_does_not_move_back(self) -> None:
+        self.tracker.mark_persisted("ref", "Successful")
+
+        self.assertFalse(self.tracker.should_write("ref", "InProgress", None))
+        self.assertFalse(self.tracker.should_write("ref", "Failed", None))
+        self.assertEqual(self.tracker.rejected, 2)
+
+    def test_in_progress_item_may_finish(self) -> None:
+        self.tracker.mark_persisted("ref", "InProgress")
+
+        self.assertTrue(self.tracker.should_write("ref", "Successful", None))
+        self.assertTrue(self.tracker.should_write("ref", "Failed", None))
+
+    def test_current_status_overrides_persisted(self) -> None:
+        self.tracker.mark_persisted("ref", "InProgress")
+
+        self.assertFalse(self.tracker.should_write("ref", "InProgress", "Failed"))
+
+    def test_only_persisted_statuses_count_as_written(self) -> None:
+        self.tracker.should_write("ref", "InProgress", None)
+        self.assertEqual(self.tracker.written, 0)
+
+        self.tracker.mark_persisted("ref", "Successful", written=2)
+
+        self.assertEqual(self.tracker.written, 2)
+        self.assertEqual(self.tracker.get_persisted("ref"), "Successful")
+
+
+class JournalizingWriteBufferTest(unittest.TestCase):
+    """Write an item's buffered statuses and metadata in one batch."""
+
+    def setUp(self) -> None:
+        self.tracker = ProcessStatusTracker()
+        patch = mock.patch.object(
+            journalizing_db_handler, "_STATUS_TRACKER", self.tracker
+        )
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.buffer = JournalizingWriteBuffer(reference="ref")
+
+    def flush(self, connection: FakeConnection) -> None:
+        with mock.patch.object(
+            journalizing_db_handler.pyodbc, "connect", return_value=connection
+        ):
+            self.buffer.flush("connection string")
+
+    def test_merges_fragments_of_a_step(self) -> None:
+        self.buffer.add_status("InProgress")
+        self.buffer.add_fragment("step", {"a": 1})
+        self.buffer.add_fragment("step", {"b": 2})
+
+        batch, params = self.buffer.build_batch()
+
+        self.assertEqual(batch.count("EXEC"), 2)
+        self.assertEqual(
+            params, ["InProgress", "ref", "step", '{"a": 1, "b": 2}', "ref"]
+        )
+
+    def test_successful_flush_marks_statuses_persisted(self) -> None:
+        self.buffer.add_status("InProgress")
+        self.buffer.add_status("Successful")
+        connection = FakeConnection()
+
+        self.flush(connection)
+
+        self.assertTrue(connection.committed)
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(self.tracker.written, 2)
+        self.assertEqual(self.tracker.get_persisted("ref"), "Successful")
+
+    def test_failed_flush_keeps_writes_and_tracker(self) -> None:
+        self.buffer.add_status("InProgress")
+        connection = FakeConnection(error=journalizing_db_handler.pyodbc.Error("down"))
+
+        with self.assertRaises(journalizing_db_handler.pyodbc.Error):
+            self.flush(connection)
+
+        self.assertTrue(connection.rolled_back)
+        self.assertEqual(len(self.buffer), 1)
+        self.assertEqual(self.tracker.written, 0)
+        self.assertIsNone(self.tracker.get_persisted("ref"))
+
+    def test_flush_failure_is_raised_to_the_item(self) -> None:
+        self.buffer.add_status("InProgress")
+        connection = FakeConnection(error=journalizing_db_handler.pyodbc.Error("down"))
+        patches = [
+            mock.patch.object(
+                journalizing_db_handler, "get_rpa_constant", return_value="conn"
+            ),
+            mock.patch.object(
+                journalizing_db_handler.pyodbc, "connect", return_value=connection
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        with (
+            Scope(fresh=True, journalizing_writes=self.buffer),
+            self.assertRaises(RuntimeError),
+        ):
+            journalizing_db_handler.flush_journalizing_writes()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""Tests for the patient prescan index"""
+
+import unittest
+from unittest import mock
+
+from helpers import config
+from processes.sub_processes.handlers.patient_snapshot_handler import (
+    PatientPrescanIndex,
+)
+
+
+class FakeDatabase:
+    """Answers document queries from a list of documents."""
+
+    def __init__(self, documents: list[dict]) -> None:
+        self.documents = documents
+        self.queried: list[list[str]] = []
+
+    def get_list_of_documents(self, filters: dict) -> list[dict]:
+        self.queried.append(list(filters["p.cpr"]))
+        return [d for d in self.documents if d["cpr"] in filters["p.cpr"]]
+
+
+class PatientPrescanIndexTest(unittest.TestCase):
+    """Prescan the documents of queued items."""
+
+    def setUp(self) -> None:
+        self.database = FakeDatabase(
+            [
+                {"cpr": "1", "DocumentDescription": "Formular ref-a"},
+                {"cpr": "2", "DocumentDescription": "Formular other"},
+            ]
+        )
+        self.index = PatientPrescanIndex()
+
+    def test_only_the_item_document_counts(self) -> None:
+        self.index.load(self.database, {"ref-a": "1", "ref-b": "2"})
+
+        self.assertTrue(self.index.take("ref-a", "1").document_exists)
+        self.assertFalse(self.index.take("ref-b", "2").document_exists)
+        self.assertEqual(self.index.count_documents_existing(), 0)
+
+    def test_queries_cpr_numbers_in_chunks(self) -> None:
+        items = {f"ref-{i}": str(i) for i in range(5)}
+
+        with mock.patch.object(config, "PATIENT_PRESCAN_CHUNK_SIZE", 2):
+            self.index.load(self.database, items)
+
+        self.assertEqual(len(self.database.queried), 3)
+
+    def test_take_removes_the_entry(self) -> None:
+        self.index.load(self.database, {"ref-a": "1"})
+
+        self.assertIsNotNone(self.index.take("ref-a", "1"))
+        self.assertIsNone(self.index.take("ref-a", "1"))
+
+    def test_take_ignores_entry_for_other_cpr(self) -> None:
+        self.index.load(self.database, {"ref-a": "1"})
+
+        self.assertIsNone(self.index.take("ref-a", "2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+"""Tests for reading the queue source and adding items to the queue"""
+
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from helpers import config
+from processes import queue_handler
+
+
+class FakeSourceCursor:
+    """Serves pending rows by key, the way the keyset queries select them."""
+
+    def __init__(self, rows: list[tuple[str, str]]) -> None:
+        self.rows = rows
+        self.queries: list[tuple[str, tuple]] = []
+        self.result: list[tuple[str, str]] = []
+
+    def execute(self, query: str, *params: object) -> None:
+        self.queries.append((query, params))
+        size, _status, *after = params
+        rows = [row for row in self.rows if not after or row[0] > after[0]]
+        self.result = rows[:size]
+
+    def fetchall(self) -> list[tuple[str, str]]:
+        return self.result
+
+    def close(self) -> None:
+        pass
+
+
+class FakeSourceConnection:
+    """Connection handing out one FakeSourceCursor."""
+
+    def __init__(self, cursor: FakeSourceCursor) -> None:
+        self.cursor_obj = cursor
+        self.closed = False
+
+    def cursor(self) -> FakeSourceCursor:
+        return self.cursor_obj
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class RetrieveItemsForQueueTest(unittest.TestCase):
+    """Read the pending submissions chunk by chunk."""
+
+    def setUp(self) -> None:
+        self.connect = mock.Mock()
+        patches = [
+            mock.patch.object(config, "QUEUE_CHUNK_SIZE", 2),
+            mock.patch.object(config, "QUEUE_SOURCE_TABLE", "[dbo].[Forms]"),
+            mock.patch.object(queue_handler.pyodbc, "connect", self.connect),
+            mock.patch.object(queue_handler, "get_rpa_constant", return_value="conn"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def read(self, count: int) -> tuple[list[dict], FakeSourceCursor]:
+        cursor = FakeSourceCursor(
+            [(f"form-{i}", f'{{"n": {i}}}') for i in range(count)]
+        )
+        connection = FakeSourceConnection(cursor)
+        self.connect.return_value = connection
+        items = list(queue_handler.retrieve_items_for_queue())
+        self.assertTrue(connection.closed)
+        return items, cursor
+
+    def test_later_chunks_seek_past_the_last_key(self) -> None:
+        items, cursor = self.read(5)
+
+        self.assertEqual([item["reference"] for item in items][-1], "form-4")
+        self.assertEqual(items[0]["data"], {"n": 0})
+        queries = [query for query, _ in cursor.queries]
+        self.assertNotIn("> ?", queries[0])
+        self.assertTrue(all("> ?" in query for query in queries[1:]))
+        self.assertEqual(
+            [params[2:] for _, params in cursor.queries], [(), ("form-1",), ("form-3",)]
+        )
+
+    def test_stops_after_a_short_chunk(self) -> None:
+        _, cursor = self.read(3)
+
+        self.assertEqual(len(cursor.queries), 2)
+
+    def test_full_last_chunk_reads_one_empty_chunk(self) -> None:
+        items, cursor = self.read(4)
+
+        self.assertEqual(len(items), 4)
+        self.assertEqual(len(cursor.queries), 3)
+
+    def test_reads_nothing_without_a_source_table(self) -> None:
+        with mock.patch.object(config, "QUEUE_SOURCE_TABLE", None):
+            items = list(queue_handler.retrieve_items_for_queue())
+
+        self.assertEqual(items, [])
+        self.connect.assert_not_called()
+
+
+class FakeWorkqueue:
+    """Records added items, failing the first add of some references."""
+
+    def __init__(self, fail_once: set[str] | None = None) -> None:
+        self.fail_once = set(fail_once or ())
+        self.added: list[str] = []
+        self.lock = threading.Lock()
+
+    def add_item(self, _data: dict, reference: str) -> None:
+        with self.lock:
+            if reference in self.fail_once:
+                self.fail_once.discard(reference)
+                raise ConnectionError("queue busy")
+            self.added.append(reference)
+
+
+class ConcurrentAddTest(unittest.TestCase):
+    """Add items from a source iterable through the concurrent workers."""
+
+    def setUp(self) -> None:
+        self.source_threads: set[str] = set()
+        patches = [
+            mock.patch.object(config, "MAX_CONCURRENCY", 4),
+            mock.patch.object(config, "MIN_CONCURRENCY", 1),
+            mock.patch.object(config, "INITIAL_CONCURRENCY", 4),
+            mock.patch.object(config, "QUEUE_CHUNK_SIZE", 3),
+            mock.patch.object(config, "RETRY_BASE_DELAY", 0),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def items(self, count: int, fail_at: int | None = None):
+        for i in range(count):
+            self.source_threads.add(threading.current_thread().name)
+            if i == fail_at:
+                raise RuntimeError("source failed")
+            yield {"reference": f"ref-{i}"}
+
+    def add(self, workqueue: FakeWorkqueue, items) -> list[str]:
+        async def run() -> list[str]:
+            return await asyncio.wait_for(
+                queue_handler.concurrent_add(workqueue, items), timeout=10
+            )
+
+        return asyncio.run(run())
+
+    def test_adds_every_item_and_retries_failures(self) -> None:
+        workqueue = FakeWorkqueue(fail_once={"ref-3"})
+
+        added = self.add(workqueue, self.items(10))
+
+        self.assertEqual(sorted(added), sorted(f"ref-{i}" for i in range(10)))
+        self.assertEqual(sorted(workqueue.added), sorted(added))
+
+    def test_source_is_read_from_one_thread(self) -> None:
+        self.add(FakeWorkqueue(), self.items(10))
+
+        self.assertEqual(len(self.source_threads), 1)
+        self.assertTrue(self.source_threads.pop().startswith("queue-source"))
+
+    def test_source_failure_stops_the_workers(self) -> None:
+        async def run() -> set[asyncio.Task]:
+            # Fails in the third chunk, after the workers took the first ones
+            with self.assertRaisesRegex(RuntimeError, "source failed"):
+                await queue_handler.concurrent_add(
+                    FakeWorkqueue(), self.items(10, fail_at=7)
+                )
+            await asyncio.sleep(0)
+            return asyncio.all_tasks() - {asyncio.current_task()}
+
+        self.assertEqual(asyncio.run(run()), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
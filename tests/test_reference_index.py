@@ -0,0 +1,109 @@
+"""Tests for the local index of queued references"""
+
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from helpers import ats_functions, config
+from helpers.reference_index import ReferenceIndex
+
+
+class FakeWorkqueue:
+    """Pages workqueue item rows oldest first, like the API."""
+
+    def __init__(self) -> None:
+        self.id = 1
+        self.rows: list[dict] = []
+        self.next_id = 1
+        self.start_pages: list[int] = []
+
+    def append(self, count: int) -> None:
+        for _ in range(count):
+            self.rows.append({"id": self.next_id, "reference": f"ref-{self.next_id}"})
+            self.next_id += 1
+
+    def item_count(self, _workqueue: object) -> int:
+        return len(self.rows)
+
+    def iter_items(self, _workqueue: object, return_data=False, start_page: int = 1):
+        self.start_pages.append(start_page)
+        for row in self.rows[(start_page - 1) * config.ATS_PAGE_SIZE :]:
+            yield (row["reference"], row) if return_data else row["reference"]
+
+
+class ReferenceIndexSyncTest(unittest.TestCase):
+    """Sync the index against a fake workqueue."""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.index = ReferenceIndex(os.path.join(tmp.name, "index.sqlite3"))
+        self.addCleanup(self.index.close)
+
+        self.queue = FakeWorkqueue()
+        patches = [
+            mock.patch.object(config, "ATS_PAGE_SIZE", 2),
+            mock.patch.object(
+                ats_functions, "get_workqueue_item_count", self.queue.item_count
+            ),
+            mock.patch.object(
+                ats_functions, "iter_workqueue_items", self.queue.iter_items
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def queued(self) -> set[str]:
+        references = [row["reference"] for row in self.queue.rows]
+        return self.index.existing(self.queue.id, [*references, "ref-missing"])
+
+    def sync(self) -> None:
+        self.queue.start_pages.clear()
+        self.index.sync(SimpleNamespace(id=self.queue.id))
+
+    def test_first_sync_reads_whole_queue(self) -> None:
+        self.queue.append(5)
+
+        self.sync()
+
+        self.assertEqual(self.queue.start_pages, [1])
+        self.assertEqual(len(self.queued()), 5)
+
+    def test_incremental_sync_reads_from_last_seen_page(self) -> None:
+        self.queue.append(5)
+        self.sync()
+        self.queue.append(3)
+
+        self.sync()
+
+        # Item 5 was on page 3, which has filled up since
+        self.assertEqual(self.queue.start_pages, [3])
+        self.assertEqual(len(self.queued()), 8)
+
+    def test_no_new_items_on_full_page_is_incremental(self) -> None:
+        self.queue.append(4)
+        self.sync()
+
+        self.sync()
+
+        self.assertEqual(self.queue.start_pages, [2])
+
+    def test_deleted_items_reconcile_whole_queue(self) -> None:
+        self.queue.append(6)
+        self.sync()
+        del self.queue.rows[:2]
+        self.queue.append(1)
+
+        self.sync()
+
+        # Page 3 now starts at item 7, past the high-water mark of item 6
+        self.assertEqual(self.queue.start_pages, [3, 1])
+        self.assertEqual(len(self.queued()), 5)
+        self.assertEqual(self.index.existing(self.queue.id, ["ref-1"]), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
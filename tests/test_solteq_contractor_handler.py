@@ -0,0 +1,92 @@
+"""Tests for the clinic directory"""
+
+import unittest
+
+from processes.sub_processes.handlers.solteq_contractor_handler import (
+    ClinicDirectory,
+    normalize_phone_number,
+)
+
+
+class FakeClinicDatabase:
+    """Answers clinic queries from a list, counting the loads."""
+
+    def __init__(self, clinics: list[dict]) -> None:
+        self.clinics = clinics
+        self.loads = 0
+
+    def get_list_of_clinics(self) -> list[dict]:
+        self.loads += 1
+        return list(self.clinics)
+
+
+class NormalizePhoneNumberTest(unittest.TestCase):
+    """Reduce phone numbers to comparable digits."""
+
+    def test_strips_formatting(self) -> None:
+        self.assertEqual(normalize_phone_number("12 34-56 78"), "12345678")
+
+    def test_strips_danish_country_code(self) -> None:
+        self.assertEqual(normalize_phone_number("+45 12 34 56 78"), "12345678")
+        self.assertEqual(normalize_phone_number("4512345678"), "12345678")
+
+    def test_keeps_eight_digits_starting_with_45(self) -> None:
+        self.assertEqual(normalize_phone_number("45123456"), "45123456")
+
+    def test_empty_values(self) -> None:
+        self.assertEqual(normalize_phone_number(None), "")
+        self.assertEqual(normalize_phone_number(12345678), "12345678")
+
+
+class ClinicDirectoryTest(unittest.TestCase):
+    """Look up clinics by phone number or contractor ID."""
+
+    def setUp(self) -> None:
+        self.database = FakeClinicDatabase(
+            [
+                {"name": "a", "phoneNumber": "+45 11 11 11 11", "contractorId": "1"},
+                {"name": "b", "phoneNumber": "22222222", "contractorId": " 2 "},
+                {"name": "c", "phoneNumber": "22 22 22 22", "contractorId": "3"},
+            ]
+        )
+        self.directory = ClinicDirectory(ttl=3600, miss_refresh_interval=3600)
+
+    def names(self, phone_number, contractor_id) -> list[str]:
+        clinics = self.directory.lookup(self.database, phone_number, contractor_id)
+        return [clinic["name"] for clinic in clinics]
+
+    def test_matches_normalized_phone_number(self) -> None:
+        self.assertEqual(self.names("11111111", None), ["a"])
+
+    def test_matches_contractor_id(self) -> None:
+        self.assertEqual(self.names(None, "2"), ["b"])
+
+    def test_shared_phone_number_matches_several(self) -> None:
+        self.assertEqual(self.names("+4522222222", "3"), ["b", "c"])
+
+    def test_loads_once(self) -> None:
+        self.names("11111111", None)
+        self.names(None, "2")
+
+        self.assertEqual(self.database.loads, 1)
+
+    def test_reloads_after_ttl(self) -> None:
+        self.names("11111111", None)
+        self.directory.ttl = -1
+
+        self.names("11111111", None)
+
+        self.assertEqual(self.database.loads, 2)
+
+    def test_miss_reloads_only_after_interval(self) -> None:
+        self.names("11111111", None)
+        self.database.clinics.append({"name": "d", "phoneNumber": "44444444"})
+
+        self.assertEqual(self.names("44444444", None), [])
+        self.directory.miss_refresh_interval = -1
+        self.assertEqual(self.names("44444444", None), ["d"])
+        self.assertEqual(self.database.loads, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
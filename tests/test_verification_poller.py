@@ -0,0 +1,56 @@
+"""Tests for the verification poller"""
+
+import unittest
+from unittest import mock
+
+from helpers import config, verification_poller
+from helpers.verification_poller import poll_until
+
+
+class PollUntilTest(unittest.TestCase):
+    """Poll a check until it passes or times out."""
+
+    def setUp(self) -> None:
+        self.sleeps: list[float] = []
+        patches = [
+            mock.patch.object(config, "VERIFY_BACKOFF", 2),
+            mock.patch.object(verification_poller, "_STATS", {}),
+            mock.patch("time.sleep", self.sleeps.append),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def check_after(self, attempts: int) -> mock.Mock:
+        return mock.Mock(side_effect=[None] * (attempts - 1) + ["found"])
+
+    def test_first_passing_check_returns_at_once(self) -> None:
+        result = poll_until(self.check_after(1), "write", timeout=10)
+
+        self.assertEqual(result, "found")
+        self.assertEqual(self.sleeps, [])
+
+    def test_delay_grows_up_to_max_delay(self) -> None:
+        check = self.check_after(5)
+
+        result = poll_until(check, "write", timeout=100, initial_delay=1, max_delay=3)
+
+        self.assertEqual(result, "found")
+        self.assertEqual(self.sleeps, [1, 2, 3, 3])
+        self.assertEqual(check.call_count, 5)
+
+    def test_records_latency_stats(self) -> None:
+        poll_until(self.check_after(1), "write", timeout=10)
+        poll_until(self.check_after(1), "write", timeout=10)
+
+        self.assertEqual(verification_poller.get_poll_stats()["write"].count, 2)
+
+    def test_times_out(self) -> None:
+        with self.assertRaises(TimeoutError):
+            poll_until(lambda: None, "write", timeout=0)
+
+        self.assertEqual(verification_poller.get_poll_stats()["write"].timeouts, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()